@@ -0,0 +1,52 @@
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from feeds.atom import newest_entry
+from feeds.poller import feedparser_video
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', '*.xml')
+
+def measure(parse, body, rounds):
+    parse(body)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        parse(body)
+    elapsed = (time.perf_counter() - start) / rounds
+    
+    tracemalloc.start()
+    parse(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description='CPU time and allocations per poll for feedparser vs the streaming parser')
+    parser.add_argument('--rounds', type=int, default=200)
+    parser.add_argument('fixtures', nargs='*', help='feed files to time, save a real one with curl for real numbers; defaults to the synthetic benchmarks/fixtures/*.xml')
+    args = parser.parse_args()
+    
+    for path in args.fixtures or sorted(glob.glob(FIXTURES)):
+        with open(path, 'rb') as f:
+            body = f.read()
+        if newest_entry(body) != feedparser_video(body):
+            print(f'{path}: parsers disagree, skipping')
+            continue
+        
+        print(f'{os.path.basename(path)} ({len(body) / 1024:.1f} KiB)')
+        results = {}
+        for name, parse in (('feedparser', feedparser_video), ('streaming', newest_entry)):
+            elapsed, peak = measure(parse, body, args.rounds)
+            results[name] = elapsed, peak
+            print(f'{name:>10}: {elapsed * 1000:7.3f} ms/poll  {peak / 1024:8.1f} KiB peak')
+        cpu = results['streaming'][0] / results['feedparser'][0]
+        memory = results['streaming'][1] / results['feedparser'][1]
+        print(f'streaming uses {cpu:.0%} of the CPU time and {memory:.0%} of the allocations')
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
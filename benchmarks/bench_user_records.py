@@ -0,0 +1,57 @@
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage.records import UserRecord
+
+def fake_users(count, guilds):
+    rng = random.Random(0)
+    guild_ids = [rng.randrange(10**17, 10**18) for _ in range(guilds)]
+    now = time.time()
+    for i in range(count):
+        yield guild_ids[i % guilds], rng.randrange(10**17, 10**18), {
+            'coins': rng.randrange(0, 50000), 'bank': rng.randrange(0, 50000),
+            'level': rng.randrange(1, 60), 'xp': rng.randrange(0, 6000),
+            'last_message': now - rng.random() * 86400, 'last_daily': now - rng.random() * 86400 * 7, 'last_work': 0
+        }
+
+def dict_layout(users):
+    return {f'{guild_id}_{user_id}': dict(user) for guild_id, user_id, user in users}
+
+def record_layout(users):
+    table = {}
+    for guild_id, user_id, user in users:
+        table.setdefault(guild_id, {})[user_id] = UserRecord.from_dict(user)
+    return table
+
+def measure(build, users):
+    tracemalloc.start()
+    start = time.perf_counter()
+    table = build(users)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del table
+    return size, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory used by the dict vs UserRecord user tables')
+    parser.add_argument('--users', type=int, default=500_000)
+    parser.add_argument('--guilds', type=int, default=50)
+    args = parser.parse_args()
+    
+    users = list(fake_users(args.users, args.guilds))
+    results = {}
+    for name, build in (('dict', dict_layout), ('UserRecord', record_layout)):
+        size, elapsed = measure(build, users)
+        results[name] = size
+        print(f'{name:>10}: {size / 1024 / 1024:8.1f} MiB  {size / args.users:6.0f} B/user  built in {elapsed:.2f}s')
+    print(f'UserRecord uses {results["UserRecord"] / results["dict"]:.0%} of the dict layout')
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
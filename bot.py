@@ -1,59 +1,34 @@
 import discord
 from discord.ext import commands
 import os
-import json
 import logging
-import tomllib
 from aiohttp import web
 import asyncio
+import signal
+import sys
+import json
+import hashlib
+import secrets
+from storage import SimpleDB, create_engine, write_atomic
+from redirect import RedirectWorkers
+from outbound import Dispatcher
+from feeds import WebSubscriber
+from config import ConfigError, load_config, restart_needed
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger('bot')
 
-def load_config():
-    base_path = os.path.dirname(__file__)
-    config_path = os.path.join(base_path, "config.toml")
-    try:
-        print(f"Loading config from: {config_path}")
-        with open(config_path, "rb") as f:
-            return tomllib.load(f)
-    except FileNotFoundError:
-        logger.error("config.toml missing.")
-        exit(1)
-
-CONFIG = load_config()
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "config.toml")
 
-class SimpleDB:
-    def __init__(self, filename):
-        self.filename = filename
-        self.data = self.load()
-    
-    def load(self):
-        if os.path.exists(self.filename):
-            try:
-                with open(self.filename, 'r') as f:
-                    return json.load(f)
-            except:
-                return {'users': {}, 'guilds': {}}
-        return {'users': {}, 'guilds': {}}
-    
-    def save(self):
-        with open(self.filename, 'w') as f:
-            json.dump(self.data, f, indent=2)
-    
-    def get_user(self, guild_id, user_id):
-        key = f"{guild_id}_{user_id}"
-        if key not in self.data['users']:
-            self.data['users'][key] = {
-                'coins': 0, 'bank': 0, 'level': 1, 'xp': 0,
-                'last_message': 0, 'last_daily': 0, 'last_work': 0
-            }
-        return self.data['users'][key]
-    
-    def set_user(self, guild_id, user_id, data):
-        key = f"{guild_id}_{user_id}"
-        self.data['users'][key] = data
-        self.save()
+try:
+    print(f"Loading config from: {CONFIG_PATH}")
+    CONFIG = load_config(CONFIG_PATH)
+except FileNotFoundError:
+    logger.error("config.toml missing.")
+    exit(1)
+except ConfigError as e:
+    logger.error(f"Invalid config.toml: {e}")
+    exit(1)
 
 class MyBot(commands.Bot):
     def __init__(self):
@@ -62,18 +37,104 @@ class MyBot(commands.Bot):
         intents.members = True
         
         super().__init__(command_prefix='/', intents=intents)
-        self.db = SimpleDB(CONFIG['bot']['data_file'])
+        self.db = SimpleDB(
+            create_engine(CONFIG),
+            CONFIG.storage.flush_interval,
+            CONFIG.storage.flush_threshold,
+            CONFIG.storage.ledger_file
+        )
+        self.outbound = Dispatcher(CONFIG.outbound.rate, CONFIG.outbound.burst, CONFIG.outbound.queue_size)
+        self.websub = None
+        if CONFIG.websub.public_url:
+            # without WEBSUB_SECRET a new one is made each start, every subscription is renewed with it on startup anyway
+            self.websub = WebSubscriber(
+                CONFIG.websub.hub,
+                CONFIG.websub.public_url,
+                os.getenv('WEBSUB_SECRET') or secrets.token_hex(20),
+                CONFIG.websub.lease,
+                lambda channel_id, video: self.dispatch('websub_video', channel_id, video)
+            )
         self.config = CONFIG
+        self.web_started = False
+        self.redirect_workers = None
     
     async def setup_hook(self):
-        for extension in self.config['bot']['enabled_cogs']:
+        for extension in self.config.bot.enabled_cogs:
             try:
                 await self.load_extension(extension)
                 logger.info(f'Loaded: {extension}')
             except Exception as e:
                 logger.error(f'Error {extension}: {e}')
         
-        await self.tree.sync()
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.create_task(self.close()))
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, self.reload_from_signal)
+        except NotImplementedError:
+            pass
+        
+        await self.sync_commands()
+    
+    async def sync_commands(self):
+        dev_guild = os.getenv('DEV_GUILD_ID')
+        guild = discord.Object(id=int(dev_guild)) if dev_guild else None
+        if guild:
+            self.tree.copy_global_to(guild=guild)
+        
+        payload = json.dumps([command.to_dict() for command in self.tree.get_commands(guild=guild)], sort_keys=True)
+        digest = hashlib.sha256(payload.encode()).hexdigest()
+        scope = f'{self.application_id}:{dev_guild or "global"}'
+        
+        path = self.config.bot.command_sync_file
+        try:
+            with open(path, 'r') as f:
+                synced = json.load(f)
+        except (OSError, ValueError):
+            synced = {}
+        
+        force = '--sync' in sys.argv or os.getenv('SYNC_COMMANDS') == '1'
+        if not force and synced.get(scope) == digest:
+            logger.info('Commands unchanged since last sync, skipping it')
+            return
+        
+        commands_synced = await self.tree.sync(guild=guild)
+        logger.info(f'Synced {len(commands_synced)} commands {f"to guild {dev_guild}" if dev_guild else "globally"}')
+        
+        synced[scope] = digest
+        write_atomic(path, json.dumps(synced).encode())
+    
+    def reload_config(self):
+        config = load_config(CONFIG_PATH)
+        restart = restart_needed(self.config, config)
+        # a single assignment, so every reader sees either the whole old config or the whole new one
+        self.config = config
+        self.db.flush_interval = config.storage.flush_interval
+        self.db.flush_threshold = config.storage.flush_threshold
+        self.outbound.configure(config.outbound.rate, config.outbound.burst, config.outbound.queue_size)
+        if self.websub:
+            self.websub.lease = config.websub.lease
+        self.dispatch('config_reload', config)
+        logger.info('Reloaded config.toml')
+        if restart:
+            logger.warning(f'Changed settings that need a restart: {", ".join(restart)}')
+        return restart
+    
+    def reload_from_signal(self):
+        try:
+            self.reload_config()
+        except (OSError, ConfigError) as e:
+            logger.error(f'Config not reloaded: {e}')
+    
+    async def close(self):
+        if self.redirect_workers:
+            await self.redirect_workers.stop()
+        await self.outbound.close()
+        logger.info(f'Outbound messages: {self.outbound.stats}')
+        if self.websub:
+            await self.websub.close()
+            logger.info(f'WebSub: {self.websub.stats}')
+        await super().close()
+        self.db.close()
+        logger.info(f'Database closed after {self.db.stats["flushes"]} flushes ({self.db.stats["bytes_written"]:,} bytes)')
 
 bot = MyBot()
 
@@ -82,27 +143,44 @@ async def health_check(request):
 
 async def redirect_handler(request):
     code = request.match_info.get('code', '')
-    if os.path.exists(CONFIG['bot']['data_file']):
-        try:
-            with open(CONFIG['bot']['data_file'], 'r') as f:
-                data = json.load(f)
-            for guild_id, guild_data in data.get('guilds', {}).items():
-                if 'urls' in guild_data and code in guild_data['urls']:
-                    return web.Response(status=301, headers={'Location': guild_data['urls'][code]})
-        except Exception as e:
-            logger.error(f'Error: {e}')
-    return web.Response(text='Not Found', status=404)
+    url = bot.db.links.resolve(code)
+    if url is None:
+        return web.Response(text='Not Found', status=404)
+    bot.db.clicks.record(code)
+    return web.Response(status=301, headers={'Location': url})
 
 async def start_web_server():
+    if bot.web_started:
+        return
+    bot.web_started = True
+    host = '0.0.0.0'
+    port = int(os.getenv('PORT', 8080))
+    
     app = web.Application()
     app.router.add_get('/', health_check)
     app.router.add_get('/health', health_check)
-    app.router.add_get('/{code}', redirect_handler)
+    if bot.websub:
+        app.router.add_get('/websub/{channel_id}', bot.websub.verify)
+        app.router.add_post('/websub/{channel_id}', bot.websub.deliver)
+    
+    if CONFIG.web.redirect_workers:
+        upstream = f'http://127.0.0.1:{CONFIG.websub.internal_port}' if bot.websub else None
+        bot.redirect_workers = RedirectWorkers(bot.db.links, bot.db.clicks, CONFIG.web.redirect_table, port, CONFIG.web.redirect_workers, upstream)
+        await bot.redirect_workers.start()
+        logger.info(f'Started {CONFIG.web.redirect_workers} redirect workers on port {port}')
+        if not bot.websub:
+            return
+        host, port = '127.0.0.1', CONFIG.websub.internal_port
+    else:
+        app.router.add_get('/{code}', redirect_handler)
+    
     runner = web.AppRunner(app)
     await runner.setup()
-    port = int(os.getenv('PORT', 8080))
-    site = web.TCPSite(runner, '0.0.0.0', port)
+    site = web.TCPSite(runner, host, port)
     await site.start()
+    if bot.websub:
+        bot.websub.listening = True
+        logger.info(f'Receiving YouTube pushes at {CONFIG.websub.public_url}/websub/')
 
 @bot.event
 async def on_ready():
@@ -2,7 +2,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import random
-from datetime import datetime
+from storage import InsufficientFunds, OnCooldown
 
 class Economy(commands.Cog):
     def __init__(self, bot):
@@ -11,49 +11,37 @@ class Economy(commands.Cog):
     @app_commands.command(name='balance', description='Check your coin balance')
     async def balance(self, interaction: discord.Interaction, member: discord.Member = None):
         target = member or interaction.user
-        user_data = self.bot.db.get_user(str(interaction.guild.id), str(target.id))
+        user_data = self.bot.db.get_user(interaction.guild.id, target.id)
         
         embed = discord.Embed(
             title='Balance',
-            description=f'{target.mention} has **{user_data["coins"]:,}** coins in wallet and **{user_data["bank"]:,}** in bank!\n**Total:** {user_data["coins"] + user_data["bank"]:,} coins',
+            description=f'{target.mention} has **{user_data.coins:,}** coins in wallet and **{user_data.bank:,}** in bank!\n**Total:** {user_data.coins + user_data.bank:,} coins',
             color=0xFFD700
         )
         await interaction.response.send_message(embed=embed)
     
     @app_commands.command(name='daily', description='Claim your daily reward')
     async def daily(self, interaction: discord.Interaction):
-        user_data = self.bot.db.get_user(str(interaction.guild.id), str(interaction.user.id))
-        now = datetime.now().timestamp()
-        
-        if now - user_data['last_daily'] < 86400:
-            time_left = 86400 - (now - user_data['last_daily'])
-            hours = int(time_left / 3600)
+        reward = 100
+        try:
+            user_data = await self.bot.db.bank.reward(interaction.guild.id, interaction.user.id, reward, 'daily', cooldown=('last_daily', 86400))
+        except OnCooldown as e:
+            hours = int(e.remaining / 3600)
             await interaction.response.send_message(f'You already claimed your daily! Come back in {hours} hours.', ephemeral=True)
             return
         
-        reward = 100
-        user_data['coins'] += reward
-        user_data['last_daily'] = now
-        self.bot.db.set_user(str(interaction.guild.id), str(interaction.user.id), user_data)
-        
-        await interaction.response.send_message(f'You claimed your daily reward of **{reward:,}** coins!\n💰 New balance: **{user_data["coins"]:,}** coins')
+        await interaction.response.send_message(f'You claimed your daily reward of **{reward:,}** coins!\n💰 New balance: **{user_data.coins:,}** coins')
     
     @app_commands.command(name='work', description='Work to earn coins')
     async def work(self, interaction: discord.Interaction):
-        user_data = self.bot.db.get_user(str(interaction.guild.id), str(interaction.user.id))
-        now = datetime.now().timestamp()
-        
-        if now - user_data['last_work'] < 3600:
-            time_left = 3600 - (now - user_data['last_work'])
-            minutes = int(time_left / 60)
+        earnings = random.randint(10, 50)
+        try:
+            user_data = await self.bot.db.bank.reward(interaction.guild.id, interaction.user.id, earnings, 'work', cooldown=('last_work', 3600))
+        except OnCooldown as e:
+            minutes = int(e.remaining / 60)
             await interaction.response.send_message(f'You need to rest! Come back in {minutes} minutes.', ephemeral=True)
             return
         
-        earnings = random.randint(10, 50)
-        user_data['coins'] += earnings
-        user_data['last_work'] = now
-        self.bot.db.set_user(str(interaction.guild.id), str(interaction.user.id), user_data)
-        
         jobs = [
             'You worked as a programmer and earned',
             'You delivered pizza and earned',
@@ -63,7 +51,66 @@ class Economy(commands.Cog):
             'You tutored students and earned'
         ]
         
-        await interaction.response.send_message(f'{random.choice(jobs)} **{earnings:,}** coins!\n💰 New balance: **{user_data["coins"]:,}** coins')
+        await interaction.response.send_message(f'{random.choice(jobs)} **{earnings:,}** coins!\n💰 New balance: **{user_data.coins:,}** coins')
+    
+    @app_commands.command(name='pay', description='Give coins from your wallet to another member')
+    async def pay(self, interaction: discord.Interaction, member: discord.Member, amount: int):
+        if amount <= 0:
+            await interaction.response.send_message('Amount must be more than 0!', ephemeral=True)
+            return
+        if member.bot or member.id == interaction.user.id:
+            await interaction.response.send_message('You can\'t pay yourself or a bot!', ephemeral=True)
+            return
+        
+        try:
+            sender, receiver = await self.bot.db.bank.transfer(interaction.guild.id, interaction.user.id, member.id, amount)
+        except InsufficientFunds as e:
+            await interaction.response.send_message(f'You only have **{e.available:,}** coins in your wallet!', ephemeral=True)
+            return
+        
+        await interaction.response.send_message(f'{interaction.user.mention} paid {member.mention} **{amount:,}** coins!\n💰 Your wallet: **{sender.coins:,}** coins')
+    
+    @app_commands.command(name='deposit', description='Move coins from your wallet into the bank')
+    async def deposit(self, interaction: discord.Interaction, amount: int):
+        if amount <= 0:
+            await interaction.response.send_message('Amount must be more than 0!', ephemeral=True)
+            return
+        
+        try:
+            user_data = await self.bot.db.bank.deposit(interaction.guild.id, interaction.user.id, amount)
+        except InsufficientFunds as e:
+            await interaction.response.send_message(f'You only have **{e.available:,}** coins in your wallet!', ephemeral=True)
+            return
+        
+        await interaction.response.send_message(f'Deposited **{amount:,}** coins!\n💰 Wallet: **{user_data.coins:,}** • 🏦 Bank: **{user_data.bank:,}**')
+    
+    @app_commands.command(name='withdraw', description='Take coins out of the bank into your wallet')
+    async def withdraw(self, interaction: discord.Interaction, amount: int):
+        if amount <= 0:
+            await interaction.response.send_message('Amount must be more than 0!', ephemeral=True)
+            return
+        
+        try:
+            user_data = await self.bot.db.bank.withdraw(interaction.guild.id, interaction.user.id, amount)
+        except InsufficientFunds as e:
+            await interaction.response.send_message(f'You only have **{e.available:,}** coins in the bank!', ephemeral=True)
+            return
+        
+        await interaction.response.send_message(f'Withdrew **{amount:,}** coins!\n💰 Wallet: **{user_data.coins:,}** • 🏦 Bank: **{user_data.bank:,}**')
+    
+    @app_commands.command(name='economy', description='See how coins are spread around the server')
+    async def economy(self, interaction: discord.Interaction):
+        stats = self.bot.db.economy(interaction.guild.id)
+        total = stats['total'] or 1
+        
+        embed = discord.Embed(title='Server Economy', color=0xFFD700)
+        embed.add_field(name='In Circulation', value=f'{stats["total"]:,} coins', inline=False)
+        embed.add_field(name='Wallets', value=f'{stats["coins"]:,} ({stats["coins"] / total:.0%})', inline=True)
+        embed.add_field(name='Banks', value=f'{stats["bank"]:,} ({stats["bank"] / total:.0%})', inline=True)
+        embed.add_field(name='Median Balance', value=f'{stats["median"]:,.0f} coins', inline=False)
+        embed.add_field(name=f'Top {stats["top"]} Hold', value=f'{stats["top_share"]:.0%} of all coins', inline=True)
+        embed.set_footer(text=f'{stats["users"]:,} users')
+        await interaction.response.send_message(embed=embed)
 
 async def setup(bot):
     await bot.add_cog(Economy(bot))
\ No newline at end of file
@@ -1,94 +1,232 @@
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 import random
-from datetime import datetime
+import time
+from storage.ranking import PAGE_SIZE
+
+SORT_NAMES = {'level': 'level and XP', 'coins': 'coins', 'wealth': 'wallet + bank'}
+
+class CooldownTable:
+    def __init__(self):
+        self.guilds = {}
+    
+    def __len__(self):
+        return sum(len(users) for users in self.guilds.values())
+    
+    def active(self, guild_id, user_id, now):
+        users = self.guilds.get(guild_id)
+        return users is not None and users.get(user_id, 0.0) > now
+    
+    def start(self, guild_id, user_id, until):
+        users = self.guilds.get(guild_id)
+        if users is None:
+            users = self.guilds[guild_id] = {}
+        users[user_id] = until
+    
+    def sweep(self, now):
+        expired = 0
+        for guild_id, users in list(self.guilds.items()):
+            stale = [user_id for user_id, until in users.items() if until <= now]
+            for user_id in stale:
+                del users[user_id]
+            if not users:
+                del self.guilds[guild_id]
+            expired += len(stale)
+        return expired
 
 class Leveling(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.cooldowns = CooldownTable()
+        self.pending = []
+        self.sweep_cooldowns.start()
+        self.apply_xp.start()
+    
+    def cog_unload(self):
+        self.sweep_cooldowns.cancel()
+        self.apply_xp.cancel()
+        self.apply_pending(skip_busy=False)
+    
+    @tasks.loop(minutes=5)
+    async def sweep_cooldowns(self):
+        self.cooldowns.sweep(time.monotonic())
     
     @commands.Cog.listener()
     async def on_message(self, message):
         if message.author.bot or not message.guild:
             return
         
-        user_data = self.bot.db.get_user(str(message.guild.id), str(message.author.id))
-        now = datetime.now().timestamp()
+        now = time.monotonic()
+        if self.cooldowns.active(message.guild.id, message.author.id, now):
+            return
+        
+        xp_config = self.bot.config.xp
+        user_data = self.bot.db.get_user(message.guild.id, message.author.id)
+        timestamp = time.time()
+        
+        # the table starts empty after a restart, the stored timestamp still holds the cooldown then
+        remaining = user_data.last_message + xp_config.cooldown - timestamp
+        if remaining > 0:
+            self.cooldowns.start(message.guild.id, message.author.id, now + remaining)
+            return
+        
+        self.cooldowns.start(message.guild.id, message.author.id, now + xp_config.cooldown)
+        xp_gain = random.randint(xp_config.min, xp_config.max)
+        self.pending.append((message.guild.id, message.author.id, xp_gain, timestamp, message.channel, message.author.mention))
+    
+    def apply_pending(self, skip_busy=True):
+        if not self.pending:
+            return []
+        
+        events, self.pending = self.pending, []
+        xp_config = self.bot.config.xp
+        
+        batches = {}
+        for guild_id, user_id, xp_gain, timestamp, channel, mention in events:
+            batch = batches.get((guild_id, user_id))
+            if batch is None:
+                batch = batches[(guild_id, user_id)] = []
+            batch.append((xp_gain, timestamp, channel, mention))
         
-        if now - user_data['last_message'] >= self.bot.config['xp_cooldown']:
-            user_data['last_message'] = now
-            xp_gain = random.randint(self.bot.config['xp_min'], self.bot.config['xp_max'])
-            user_data['xp'] += xp_gain
-            xp_needed = user_data['level'] * self.bot.config['xp_per_level']
+        bank = self.bot.db.bank
+        announcements = []
+        for (guild_id, user_id), batch in batches.items():
+            if skip_busy and bank.busy(guild_id, user_id):
+                self.pending.extend((guild_id, user_id, *event) for event in batch)
+                continue
             
-            if user_data['xp'] >= xp_needed:
-                user_data['level'] += 1
-                user_data['xp'] = 0
-                
-                coin_reward = user_data['level'] * self.bot.config['level_up_multiplier']
-                user_data['coins'] += coin_reward
-                
-                messages = [
-                    f'gg {message.author.mention}! You leveled up to **Level {user_data["level"]}**!',
-                    f'Congrats {message.author.mention}! You\'re now **Level {user_data["level"]}**!',
-                    f'Level up! {message.author.mention} reached **Level {user_data["level"]}**!'
-                ]
-                
-                await message.channel.send(
-                    f'{random.choice(messages)} You earned **{coin_reward:,} coins**! '
-                )
+            user_data = self.bot.db.get_user(guild_id, user_id)
+            user_data.last_message = batch[-1][1]
+            coins_earned = 0
             
-            self.bot.db.set_user(str(message.guild.id), str(message.author.id), user_data)
+            total = sum(event[0] for event in batch)
+            if user_data.xp + total < user_data.level * xp_config.per_level:
+                user_data.xp += total
+            else:
+                for xp_gain, timestamp, channel, mention in batch:
+                    user_data.xp += xp_gain
+                    if user_data.xp >= user_data.level * xp_config.per_level:
+                        user_data.level += 1
+                        user_data.xp = 0
+                        
+                        coin_reward = user_data.level * xp_config.level_up_multiplier
+                        coins_earned += coin_reward
+                        
+                        messages = [
+                            f'gg {mention}! You leveled up to **Level {user_data.level}**!',
+                            f'Congrats {mention}! You\'re now **Level {user_data.level}**!',
+                            f'Level up! {mention} reached **Level {user_data.level}**!'
+                        ]
+                        announcements.append((channel, f'{random.choice(messages)} You earned **{coin_reward:,} coins**! '))
+            
+            self.bot.db.set_user(guild_id, user_id, user_data)
+            if coins_earned:
+                bank.apply(guild_id, user_id, 'level-up', coins=coins_earned)
+        
+        return announcements
+    
+    @tasks.loop(seconds=1)
+    async def apply_xp(self):
+        for channel, text in self.apply_pending():
+            self.bot.outbound.submit(channel, text, merge_key='level-up')
     
     @app_commands.command(name='rank', description='View your rank and level')
     async def rank(self, interaction: discord.Interaction, member: discord.Member = None):
         target = member or interaction.user
-        user_data = self.bot.db.get_user(str(interaction.guild.id), str(target.id))
-        xp_needed = user_data['level'] * self.bot.config['xp_per_level']
+        user_data = self.bot.db.get_user(interaction.guild.id, target.id)
+        xp_needed = user_data.level * self.bot.config.xp.per_level
         
-        all_users = self.bot.db.get_all_guild_users(str(interaction.guild.id))
-        rank = next((i + 1 for i, u in enumerate(all_users) if u['user_id'] == str(target.id)), 'Unranked')
+        rank, total = self.bot.db.rank(interaction.guild.id, target.id)
         
-        progress = int((user_data['xp'] / xp_needed) * 20) if xp_needed > 0 else 0
+        progress = int((user_data.xp / xp_needed) * 20) if xp_needed > 0 else 0
         bar = '█' * progress + '░' * (20 - progress)
         
-        color = 0xFF6B6B if user_data['level'] >= 50 else 0xFFD93D if user_data['level'] >= 30 else 0x6BCB77 if user_data['level'] >= 15 else 0x4D96FF
+        color = 0xFF6B6B if user_data.level >= 50 else 0xFFD93D if user_data.level >= 30 else 0x6BCB77 if user_data.level >= 15 else 0x4D96FF
         
         embed = discord.Embed(color=color)
         embed.set_author(name=f"{target.display_name}'s Profile", icon_url=target.display_avatar.url)
         embed.description = f"""
-**RANK** • #{rank} / {len(all_users)}
-**LEVEL** • {user_data['level']}
-**XP** • {user_data['xp']:,} / {xp_needed:,}
+**RANK** • {f'#{rank}' if rank else 'Unranked'} / {total}
+**LEVEL** • {user_data.level}
+**XP** • {user_data.xp:,} / {xp_needed:,}
 
 `{bar}`
 
-**BALANCE** • {user_data['coins']:,} coins
+**BALANCE** • {user_data.coins:,} coins
         """
         embed.set_thumbnail(url=target.display_avatar.url)
         await interaction.response.send_message(embed=embed)
     
-    @app_commands.command(name='leaderboard', description='View the server leaderboard')
-    async def leaderboard(self, interaction: discord.Interaction):
-        all_users = self.bot.db.get_all_guild_users(str(interaction.guild.id))[:10]
-        
+    def render_leaderboard(self, sort, offset, top_users, total):
         description = []
-        for i, u in enumerate(all_users):
+        for i, (user_id, user_data) in enumerate(top_users, offset):
             medal = '🥇' if i == 0 else '🥈' if i == 1 else '🥉' if i == 2 else f'**{i+1}.**'
+            if sort == 'wealth':
+                coins = f'{user_data.coins + user_data.bank:,} coins ({user_data.coins:,} wallet + {user_data.bank:,} bank)'
+            else:
+                coins = f'{user_data.coins:,} coins'
             description.append(
-                f'{medal} <@{u["user_id"]}>\n'
-                f'└ Level {u["data"]["level"]} ({u["data"]["xp"]:,} XP) • {u["data"]["coins"]:,} coins'
+                f'{medal} <@{user_id}>\n'
+                f'└ Level {user_data.level} ({user_data.xp:,} XP) • {coins}'
             )
         
         embed = discord.Embed(
             title='Server Leaderboard',
             description='\n'.join(description) if description else 'No users yet!',
-            color=0x9B59B6,
-            timestamp=datetime.utcnow()
+            color=0x9B59B6
         )
-        embed.set_footer(text='Top 10 users by level and XP')
-        await interaction.response.send_message(embed=embed)
+        # no timestamp, the embed is cached and would keep showing when it was first rendered
+        embed.set_footer(text=f'Page {offset // PAGE_SIZE + 1} • Users {min(offset + 1, total)}-{min(offset + PAGE_SIZE, total)} by {SORT_NAMES[sort]}')
+        return embed
+    
+    def leaderboard_page(self, guild_id, sort, page):
+        return self.bot.db.leaderboard_page(guild_id, page, sort, self.render_leaderboard)
+    
+    @app_commands.command(name='leaderboard', description='View the server leaderboard')
+    @app_commands.describe(sort='What to rank users by', page='Page of 10 users to start on')
+    @app_commands.choices(sort=[
+        app_commands.Choice(name='Level', value='level'),
+        app_commands.Choice(name='Coins', value='coins'),
+        app_commands.Choice(name='Wealth (wallet + bank)', value='wealth')
+    ])
+    async def leaderboard(self, interaction: discord.Interaction, sort: str = 'level', page: int = 1):
+        embed, total, page = self.leaderboard_page(interaction.guild.id, sort, page - 1)
+        view = LeaderboardView(self, interaction.user.id, interaction.guild.id, sort, page, total)
+        await interaction.response.send_message(embed=embed, view=view)
+
+class LeaderboardView(discord.ui.View):
+    def __init__(self, cog, user_id, guild_id, sort, page, total):
+        super().__init__(timeout=180)
+        self.cog = cog
+        self.user_id = user_id
+        self.guild_id = guild_id
+        self.sort = sort
+        self.page = page
+        self.update_buttons(total)
+    
+    def update_buttons(self, total):
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = (self.page + 1) * PAGE_SIZE >= total
+    
+    async def interaction_check(self, interaction: discord.Interaction):
+        if interaction.user.id != self.user_id:
+            await interaction.response.send_message('Use /leaderboard to flip through your own copy!', ephemeral=True)
+            return False
+        return True
+    
+    async def show(self, interaction, page):
+        embed, total, self.page = self.cog.leaderboard_page(self.guild_id, self.sort, page)
+        self.update_buttons(total)
+        await interaction.response.edit_message(embed=embed, view=self)
+    
+    @discord.ui.button(label='Previous', style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, max(self.page - 1, 0))
+    
+    @discord.ui.button(label='Next', style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.page + 1)
 
 async def setup(bot):
     await bot.add_cog(Leveling(bot))
\ No newline at end of file
@@ -1,78 +1,171 @@
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
-import asyncio
 from datetime import datetime, timedelta
+import asyncio
 import logging
-import feedparser
+import time
+from config import ConfigError
+from feeds import FeedPoller, FeedScheduler
 
 logger = logging.getLogger('bot')
 
+SCHEDULER_TICK = 10
+ROLE_DEBOUNCE = 2
+
+class RoleEdits:
+    def __init__(self):
+        self.pending = {}
+    
+    def __len__(self):
+        return len(self.pending)
+    
+    def want(self, guild_id, member_id, role_id, wanted, now):
+        entry = self.pending.get((guild_id, member_id))
+        if entry is None:
+            entry = self.pending[(guild_id, member_id)] = (now, {})
+        entry[1][role_id] = wanted
+    
+    def ready(self, before):
+        # timed from the first change, so a member toggling nonstop still gets their edit every window
+        keys = [key for key, (since, _) in self.pending.items() if since <= before]
+        return [(key, self.pending.pop(key)[1]) for key in keys]
+
 class System(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.feeds = FeedPoller(bot.config.web.video_fetch_concurrency)
+        self.schedule = FeedScheduler(bot.config.web.video_check_interval, bot.config.web.video_max_interval, bot.config.websub.reconcile_interval)
+        self.role_edits = RoleEdits()
         self.check_youtube.start()
+        self.apply_role_edits.start()
     
-    def cog_unload(self):
+    async def cog_unload(self):
         self.check_youtube.cancel()
+        self.apply_role_edits.cancel()
+        for (guild_id, member_id), wanted in self.role_edits.ready(float('inf')):
+            await self.edit_roles(guild_id, member_id, wanted)
+        await self.feeds.close()
     
-    @tasks.loop(seconds=300)
-    async def check_youtube(self):
-        if 'youtube' not in self.bot.db.data:
-            return
+    @commands.Cog.listener()
+    async def on_config_reload(self, config):
+        self.schedule.configure(config.web.video_check_interval, config.web.video_max_interval, config.websub.reconcile_interval)
+    
+    def video_embed(self, video, title):
+        embed = discord.Embed(
+            title=title,
+            description=f'**{video["title"]}**',
+            url=video['link'],
+            color=0xFF0000,
+            timestamp=datetime.utcnow()
+        )
         
-        for guild_id, settings in self.bot.db.data['youtube'].items():
+        if video['thumbnail']:
+            embed.set_thumbnail(url=video['thumbnail'])
+        
+        if video['author']:
+            embed.add_field(name='Channel', value=video['author'], inline=True)
+        
+        if video['published']:
+            embed.add_field(name='Published', value=video['published'], inline=True)
+        
+        return embed
+    
+    def youtube_subscribers(self):
+        subscribers = {}
+        for guild_id, settings in self.bot.db.sections('youtube'):
             if not settings.get('enabled') or not settings.get('channel_id') or not settings.get('youtube_channel_id'):
                 continue
+            subscribers.setdefault(settings['youtube_channel_id'], []).append((guild_id, settings))
+        return subscribers
+    
+    def announce(self, video, subscribers):
+        embed = None
+        for guild_id, settings in subscribers:
+            if video['video_id'] == settings.get('last_video_id'):
+                if video['published'] and not settings.get('last_published'):
+                    settings['last_published'] = video['published']
+                    self.bot.db.mark('youtube', guild_id)
+                continue
+            # pushes also come for edits to older videos, and a deleted upload puts an older one first in the feed
+            if video['published'] and settings.get('last_published') and video['published'] <= settings['last_published']:
+                continue
             
-            try:
-                feed_url = f'https://www.youtube.com/feeds/videos.xml?channel_id={settings["youtube_channel_id"]}'
-                feed = await asyncio.to_thread(feedparser.parse, feed_url)
-                
-                if not feed.entries:
+            if settings.get('last_video_id'):
+                guild = self.bot.get_guild(int(guild_id))
+                if not guild:
                     continue
                 
-                latest = feed.entries[0]
-                video_id = latest.yt_videoid if hasattr(latest, 'yt_videoid') else latest.id.split(':')[-1]
-                
-                if video_id != settings.get('last_video_id') and settings.get('last_video_id'):
-                    guild = self.bot.get_guild(int(guild_id))
-                    if not guild:
-                        continue
-                    
-                    channel = guild.get_channel(int(settings['channel_id']))
-                    if not channel:
-                        continue
-                    
-                    embed = discord.Embed(
-                        title='New YouTube Video!',
-                        description=f'**{latest.title}**',
-                        url=latest.link,
-                        color=0xFF0000,
-                        timestamp=datetime.utcnow()
-                    )
-                    
-                    if hasattr(latest, 'media_thumbnail') and latest.media_thumbnail:
-                        embed.set_thumbnail(url=latest.media_thumbnail[0]['url'])
-                    
-                    embed.add_field(name='Channel', value=latest.author, inline=True)
-                    
-                    if hasattr(latest, 'published'):
-                        embed.add_field(name='Published', value=latest.published, inline=True)
-                    
-                    await channel.send('New video alert! @everyone', embed=embed)
-                    logger.info(f'Sent notification for: {latest.title}')
+                channel = guild.get_channel(int(settings['channel_id']))
+                if not channel:
+                    continue
                 
-                settings['last_video_id'] = video_id
-                self.bot.db.save()
+                if embed is None:
+                    embed = self.video_embed(video, 'New YouTube Video!')
+                self.bot.outbound.submit(channel, 'New video alert! @everyone', embed=embed)
+                logger.info(f'Queued notification for: {video["title"]}')
             
-            except Exception as e:
-                logger.error(f'Error checking YouTube: {e}')
+            settings['last_video_id'] = video['video_id']
+            settings['last_published'] = video['published']
+            self.bot.db.mark('youtube', guild_id)
+    
+    @commands.Cog.listener()
+    async def on_websub_video(self, youtube_channel_id, video):
+        subscribers = self.youtube_subscribers().get(youtube_channel_id)
+        if subscribers:
+            logger.debug(f'WebSub push for YouTube channel {youtube_channel_id}: {video["video_id"]}')
+            self.announce(video, subscribers)
+    
+    @tasks.loop(seconds=SCHEDULER_TICK)
+    async def check_youtube(self):
+        subscribers = self.youtube_subscribers()
+        now = time.monotonic()
+        self.schedule.sync(subscribers, now)
+        self.feeds.prune(subscribers)
+        websub = self.bot.websub
+        if websub:
+            await websub.sync(subscribers, now)
+            for youtube_channel_id in subscribers:
+                self.schedule.set_pushed(youtube_channel_id, websub.active(youtube_channel_id, now), now)
+        due = self.schedule.due(now)
+        if not due:
+            return
+        
+        results = await self.feeds.fetch_all(due)
+        logger.debug(f'Fetched {len(due)} of {len(self.schedule)} YouTube feeds: {self.feeds.stats}')
+        
+        now = time.monotonic()
+        for youtube_channel_id, video in results.items():
+            if isinstance(video, Exception):
+                self.schedule.done(youtube_channel_id, now, error=True)
+                logger.error(f'Error checking YouTube channel {youtube_channel_id}: {video}')
+                continue
+            self.schedule.done(youtube_channel_id, now, video['video_id'] if video else None)
+            if video is not None:
+                self.announce(video, subscribers[youtube_channel_id])
     
     @check_youtube.before_loop
     async def before_check_youtube(self):
         await self.bot.wait_until_ready()
     
+    @app_commands.command(name='reloadconfig', description='Reload config.toml without restarting the bot')
+    @app_commands.default_permissions(administrator=True)
+    async def reloadconfig(self, interaction: discord.Interaction):
+        if not await self.bot.is_owner(interaction.user):
+            await interaction.response.send_message('Only the bot owner can reload the config!', ephemeral=True)
+            return
+        
+        try:
+            restart = self.bot.reload_config()
+        except (OSError, ConfigError) as e:
+            await interaction.response.send_message(f'Config not reloaded: {e}', ephemeral=True)
+            return
+        
+        message = 'Config reloaded!'
+        if restart:
+            message += f'\nThese only change after a restart: {", ".join(restart)}'
+        await interaction.response.send_message(message, ephemeral=True)
+    
     @app_commands.command(name='ping', description='Check bot latency')
     async def ping(self, interaction: discord.Interaction):
         latency = round(self.bot.latency * 1000)
@@ -264,14 +357,7 @@ class System(commands.Cog):
         guild_id = str(interaction.guild.id)
         user_id = str(member.id)
         
-        if 'warnings' not in self.bot.db.data:
-            self.bot.db.data['warnings'] = {}
-        
-        if guild_id not in self.bot.db.data['warnings']:
-            self.bot.db.data['warnings'][guild_id] = {}
-        
-        if user_id not in self.bot.db.data['warnings'][guild_id]:
-            self.bot.db.data['warnings'][guild_id][user_id] = []
+        guild_warnings = self.bot.db.section('warnings', guild_id, {})
         
         warning = {
             'reason': reason,
@@ -279,10 +365,10 @@ class System(commands.Cog):
             'timestamp': datetime.utcnow().isoformat()
         }
         
-        self.bot.db.data['warnings'][guild_id][user_id].append(warning)
-        self.bot.db.save()
+        guild_warnings.setdefault(user_id, []).append(warning)
+        self.bot.db.mark('warnings', guild_id, user_id)
         
-        warning_count = len(self.bot.db.data['warnings'][guild_id][user_id])
+        warning_count = len(guild_warnings[user_id])
         
         embed = discord.Embed(
             title='Member Warned',
@@ -310,10 +396,7 @@ class System(commands.Cog):
         guild_id = str(interaction.guild.id)
         user_id = str(target.id)
         
-        if 'warnings' not in self.bot.db.data:
-            self.bot.db.data['warnings'] = {}
-        
-        user_warnings = self.bot.db.data['warnings'].get(guild_id, {}).get(user_id, [])
+        user_warnings = self.bot.db.section('warnings', guild_id, {}).get(user_id, [])
         
         if not user_warnings:
             await interaction.response.send_message(f'{target.mention} has no warnings!', ephemeral=True)
@@ -347,16 +430,15 @@ class System(commands.Cog):
         guild_id = str(interaction.guild.id)
         user_id = str(member.id)
         
-        if 'warnings' not in self.bot.db.data:
-            self.bot.db.data['warnings'] = {}
+        guild_warnings = self.bot.db.section('warnings', guild_id, {})
         
-        if guild_id not in self.bot.db.data['warnings'] or user_id not in self.bot.db.data['warnings'][guild_id]:
+        if user_id not in guild_warnings:
             await interaction.response.send_message(f'{member.mention} has no warnings to clear!', ephemeral=True)
             return
         
-        warning_count = len(self.bot.db.data['warnings'][guild_id][user_id])
-        self.bot.db.data['warnings'][guild_id][user_id] = []
-        self.bot.db.save()
+        warning_count = len(guild_warnings[user_id])
+        guild_warnings[user_id] = []
+        self.bot.db.mark('warnings', guild_id, user_id)
         
         embed = discord.Embed(
             title='Warnings Cleared',
@@ -440,87 +522,57 @@ class System(commands.Cog):
         except Exception as e:
             await interaction.response.send_message(f'An error occurred: {e}', ephemeral=True)
     
+    def queue_role_edit(self, payload, wanted):
+        if payload.message_id not in self.bot.db.reaction_roles or payload.user_id == self.bot.user.id:
+            return
+        role_id = self.bot.db.reaction_roles.role(payload.message_id, str(payload.emoji))
+        if role_id is not None:
+            self.role_edits.want(payload.guild_id, payload.user_id, role_id, wanted, time.monotonic())
+    
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload):
-        if payload.user_id == self.bot.user.id:
-            return
-        
-        guild_id = str(payload.guild_id)
-        message_id = str(payload.message_id)
-        
-        if 'reaction_roles' not in self.bot.db.data:
-            self.bot.db.data['reaction_roles'] = {}
-        
-        if guild_id not in self.bot.db.data['reaction_roles']:
-            return
-        
-        if message_id not in self.bot.db.data['reaction_roles'][guild_id]:
-            return
-        
-        emoji_str = str(payload.emoji)
-        role_id = self.bot.db.data['reaction_roles'][guild_id][message_id].get(emoji_str)
-        
-        if not role_id:
-            return
-        
-        guild = self.bot.get_guild(payload.guild_id)
-        if not guild:
-            return
-        
-        role = guild.get_role(int(role_id))
-        if not role:
-            return
-        
-        member = guild.get_member(payload.user_id)
-        if not member:
-            return
-        
-        try:
-            await member.add_roles(role)
-            logger.info(f'Added role {role.name} to {member.name}')
-        except Exception as e:
-            logger.error(f'Error adding role: {e}')
+        self.queue_role_edit(payload, True)
     
     @commands.Cog.listener()
     async def on_raw_reaction_remove(self, payload):
-        if payload.user_id == self.bot.user.id:
-            return
-        
-        guild_id = str(payload.guild_id)
-        message_id = str(payload.message_id)
-        
-        if 'reaction_roles' not in self.bot.db.data:
-            return
-        
-        if guild_id not in self.bot.db.data.get('reaction_roles', {}):
-            return
-        
-        if message_id not in self.bot.db.data['reaction_roles'][guild_id]:
-            return
-        
-        emoji_str = str(payload.emoji)
-        role_id = self.bot.db.data['reaction_roles'][guild_id][message_id].get(emoji_str)
-        
-        if not role_id:
-            return
-        
-        guild = self.bot.get_guild(payload.guild_id)
+        self.queue_role_edit(payload, False)
+    
+    @tasks.loop(seconds=1)
+    async def apply_role_edits(self):
+        ready = self.role_edits.ready(time.monotonic() - ROLE_DEBOUNCE)
+        if ready:
+            await asyncio.gather(*(self.edit_roles(guild_id, member_id, wanted) for (guild_id, member_id), wanted in ready))
+    
+    @apply_role_edits.before_loop
+    async def before_apply_role_edits(self):
+        await self.bot.wait_until_ready()
+    
+    async def edit_roles(self, guild_id, member_id, wanted):
+        guild = self.bot.get_guild(guild_id)
         if not guild:
             return
         
-        role = guild.get_role(int(role_id))
-        if not role:
+        member = guild.get_member(member_id)
+        if not member:
             return
         
-        member = guild.get_member(payload.user_id)
-        if not member:
+        current = {role.id for role in member.roles}
+        add = [guild.get_role(role_id) for role_id, want in wanted.items() if want and role_id not in current]
+        remove = [guild.get_role(role_id) for role_id, want in wanted.items() if not want and role_id in current]
+        add = [role for role in add if role]
+        remove = [role for role in remove if role]
+        if not add and not remove:
             return
         
         try:
-            await member.remove_roles(role)
-            logger.info(f'Removed role {role.name} from {member.name}')
+            # only the named roles are touched, a full role list from the cache would undo changes made meanwhile
+            if add:
+                await member.add_roles(*add)
+            if remove:
+                await member.remove_roles(*remove)
+            logger.info(f'Updated roles of {member.name}: +{[role.name for role in add]} -{[role.name for role in remove]}')
         except Exception as e:
-            logger.error(f'Error removing role: {e}')
+            logger.error(f'Error updating roles: {e}')
     
     @app_commands.command(name='reactionrole', description='[ADMIN] Create a reaction role')
     @app_commands.describe(message_id='Message ID to add reactions to', emoji='Emoji to use (e.g., 🎮)', role='Role to assign')
@@ -543,17 +595,10 @@ class System(commands.Cog):
         
         guild_id = str(interaction.guild.id)
         
-        if 'reaction_roles' not in self.bot.db.data:
-            self.bot.db.data['reaction_roles'] = {}
-        
-        if guild_id not in self.bot.db.data['reaction_roles']:
-            self.bot.db.data['reaction_roles'][guild_id] = {}
-        
-        if message_id not in self.bot.db.data['reaction_roles'][guild_id]:
-            self.bot.db.data['reaction_roles'][guild_id][message_id] = {}
-        
-        self.bot.db.data['reaction_roles'][guild_id][message_id][emoji] = str(role.id)
-        self.bot.db.save()
+        guild_reactions = self.bot.db.section('reaction_roles', guild_id, {})
+        guild_reactions.setdefault(message_id, {})[emoji] = str(role.id)
+        self.bot.db.mark('reaction_roles', guild_id, message_id)
+        self.bot.db.reaction_roles.set_message(message_id, guild_reactions[message_id])
         
         embed = discord.Embed(
             title='Reaction Role Created',
@@ -573,34 +618,32 @@ class System(commands.Cog):
     async def removereactionrole(self, interaction: discord.Interaction, message_id: str, emoji: str = None):
         guild_id = str(interaction.guild.id)
         
-        if 'reaction_roles' not in self.bot.db.data:
-            self.bot.db.data['reaction_roles'] = {}
+        guild_reactions = self.bot.db.section('reaction_roles', guild_id, {})
         
-        if guild_id not in self.bot.db.data['reaction_roles'] or message_id not in self.bot.db.data['reaction_roles'].get(guild_id, {}):
+        if message_id not in guild_reactions:
             await interaction.response.send_message('No reaction roles found for that message!', ephemeral=True)
             return
         
         if emoji:
-            if emoji not in self.bot.db.data['reaction_roles'][guild_id][message_id]:
+            if emoji not in guild_reactions[message_id]:
                 await interaction.response.send_message('That emoji is not set up for reaction roles!', ephemeral=True)
                 return
             
-            del self.bot.db.data['reaction_roles'][guild_id][message_id][emoji]
-            self.bot.db.save()
+            del guild_reactions[message_id][emoji]
+            self.bot.db.mark('reaction_roles', guild_id, message_id)
+            self.bot.db.reaction_roles.set_message(message_id, guild_reactions[message_id])
             await interaction.response.send_message(f'Removed reaction role for {emoji}')
         else:
-            del self.bot.db.data['reaction_roles'][guild_id][message_id]
-            self.bot.db.save()
+            del guild_reactions[message_id]
+            self.bot.db.mark('reaction_roles', guild_id, message_id)
+            self.bot.db.reaction_roles.set_message(message_id, None)
             await interaction.response.send_message(f'Removed all reaction roles from message {message_id}')
     
     @app_commands.command(name='listreactionroles', description='List all reaction roles')
     async def listreactionroles(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         
-        if 'reaction_roles' not in self.bot.db.data:
-            self.bot.db.data['reaction_roles'] = {}
-        
-        guild_reactions = self.bot.db.data['reaction_roles'].get(guild_id, {})
+        guild_reactions = self.bot.db.section('reaction_roles', guild_id, {})
         
         if not guild_reactions:
             await interaction.response.send_message('No reaction roles configured yet!')
@@ -645,6 +688,16 @@ class System(commands.Cog):
             ephemeral=True
         )
     
+    def check_interval_text(self, youtube_channel_id):
+        web = self.bot.config.web
+        polling = f'every {web.video_check_interval / 60:g} to {web.video_max_interval / 60:g} minutes, slower for quiet channels'
+        websub = self.bot.websub
+        if not websub:
+            return f'Checked {polling}'
+        if websub.active(youtube_channel_id, time.monotonic()):
+            return 'Instant (pushed by YouTube)'
+        return f'Instant once YouTube confirms the subscription, checked {polling} until then'
+    
     @app_commands.command(name='setupyoutube', description='[ADMIN] Set up YouTube notifications')
     @app_commands.describe(youtube_channel_id='YouTube Channel ID (from channel URL)', notification_channel='Discord channel for notifications (defaults to current channel)')
     @app_commands.default_permissions(administrator=True)
@@ -652,16 +705,12 @@ class System(commands.Cog):
         guild_id = str(interaction.guild.id)
         channel = notification_channel or interaction.channel
         
-        if 'youtube' not in self.bot.db.data:
-            self.bot.db.data['youtube'] = {}
-        
-        self.bot.db.data['youtube'][guild_id] = {
+        self.bot.db.set_section('youtube', guild_id, {
             'enabled': True,
             'channel_id': str(channel.id),
             'youtube_channel_id': youtube_channel_id.strip(),
             'last_video_id': None
-        }
-        self.bot.db.save()
+        })
         
         embed = discord.Embed(
             title='YouTube Notifications Configured',
@@ -669,7 +718,7 @@ class System(commands.Cog):
             color=0xFF0000
         )
         embed.add_field(name='YouTube Channel ID', value=f'`{youtube_channel_id}`', inline=False)
-        embed.add_field(name='Check Interval', value='Every 5 minutes', inline=True)
+        embed.add_field(name='Check Interval', value=self.check_interval_text(youtube_channel_id.strip()), inline=True)
         embed.add_field(name='Status', value='Active', inline=True)
         
         await interaction.response.send_message(embed=embed)
@@ -680,21 +729,17 @@ class System(commands.Cog):
     async def toggleyoutube(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         
-        if 'youtube' not in self.bot.db.data:
-            self.bot.db.data['youtube'] = {}
-        
-        if guild_id not in self.bot.db.data['youtube']:
-            self.bot.db.data['youtube'][guild_id] = {
-                'enabled': False,
-                'channel_id': None,
-                'last_video_id': None
-            }
+        settings = self.bot.db.section('youtube', guild_id, {
+            'enabled': False,
+            'channel_id': None,
+            'last_video_id': None
+        })
         
-        self.bot.db.data['youtube'][guild_id]['enabled'] = not self.bot.db.data['youtube'][guild_id].get('enabled', False)
-        self.bot.db.save()
+        settings['enabled'] = not settings.get('enabled', False)
+        self.bot.db.mark('youtube', guild_id)
         
-        status = 'enabled' if self.bot.db.data['youtube'][guild_id]['enabled'] else 'disabled'
-        color = 0x00FF00 if self.bot.db.data['youtube'][guild_id]['enabled'] else 0x808080
+        status = 'enabled' if settings['enabled'] else 'disabled'
+        color = 0x00FF00 if settings['enabled'] else 0x808080
         
         embed = discord.Embed(
             title='YouTube Notifications',
@@ -709,14 +754,11 @@ class System(commands.Cog):
     async def youtubestatus(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         
-        if 'youtube' not in self.bot.db.data:
-            self.bot.db.data['youtube'] = {}
-        
-        settings = self.bot.db.data['youtube'].get(guild_id, {
+        settings = self.bot.db.section('youtube', guild_id) or {
             'enabled': False,
             'channel_id': None,
             'last_video_id': None
-        })
+        }
         
         embed = discord.Embed(
             title='YouTube Notification Status',
@@ -750,10 +792,7 @@ class System(commands.Cog):
     async def testlastvideo(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
         
-        if 'youtube' not in self.bot.db.data:
-            self.bot.db.data['youtube'] = {}
-        
-        settings = self.bot.db.data['youtube'].get(guild_id, {})
+        settings = self.bot.db.section('youtube', guild_id) or {}
         
         if not settings.get('youtube_channel_id'):
             await interaction.response.send_message('YouTube Channel ID not configured! Use `/setupyoutube` first.', ephemeral=True)
@@ -762,36 +801,17 @@ class System(commands.Cog):
         await interaction.response.defer()
         
         try:
-            feed_url = f'https://www.youtube.com/feeds/videos.xml?channel_id={settings["youtube_channel_id"]}'
-            feed = await asyncio.to_thread(feedparser.parse, feed_url)
+            video = await self.feeds.fetch(settings['youtube_channel_id'], max_age=self.bot.config.web.video_check_interval)
             
-            if not feed.entries:
+            if video is None:
                 await interaction.followup.send('No videos found for this channel!')
                 return
             
-            latest = feed.entries[0]
-            video_id = latest.yt_videoid if hasattr(latest, 'yt_videoid') else latest.id.split(':')[-1]
-            
-            embed = discord.Embed(
-                title='Latest YouTube Video (Test)',
-                description=f'**{latest.title}**',
-                url=latest.link,
-                color=0xFF0000,
-                timestamp=datetime.utcnow()
-            )
-            
-            if hasattr(latest, 'media_thumbnail') and latest.media_thumbnail:
-                embed.set_thumbnail(url=latest.media_thumbnail[0]['url'])
-            
-            embed.add_field(name='Channel', value=latest.author, inline=True)
-            
-            if hasattr(latest, 'published'):
-                embed.add_field(name='Published', value=latest.published, inline=True)
-            
+            embed = self.video_embed(video, 'Latest YouTube Video (Test)')
             embed.set_footer(text='This is a test notification')
             
             await interaction.followup.send(embed=embed)
-            logger.info(f'Test notification sent for: {latest.title}')
+            logger.info(f'Test notification sent for: {video["title"]}')
         
         except Exception as e:
             await interaction.followup.send(f'Error fetching video: {e}')
@@ -1,14 +1,22 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 import re
-import random
-import string
+from datetime import datetime, timedelta, timezone
 
 class Utility(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.domain = "u.chers.moe"
+        self.flush_clicks.start()
+    
+    def cog_unload(self):
+        self.flush_clicks.cancel()
+        self.bot.db.clicks.flush()
+    
+    @tasks.loop(seconds=30)
+    async def flush_clicks(self):
+        self.bot.db.clicks.flush()
     
     def is_valid_url(self, url):
         url_pattern = re.compile(
@@ -20,18 +28,17 @@ class Utility(commands.Cog):
             r'(?:/?|[/?]\S+)$', re.IGNORECASE)
         return url_pattern.match(url) is not None
     
-    def generate_short_code(self, length=6):
-        chars = string.ascii_letters + string.digits
-        return ''.join(random.choice(chars) for _ in range(length))
+    def generate_short_code(self):
+        state = self.bot.db.section('meta', 'shortener', {'next_code': 0})
+        code = self.bot.db.links.allocate(state)
+        self.bot.db.mark('meta', 'shortener', 'next_code')
+        return code
     
     def get_guild_data(self, guild_id):
-        if 'guilds' not in self.bot.db.data:
-            self.bot.db.data['guilds'] = {}
-        if str(guild_id) not in self.bot.db.data['guilds']:
-            self.bot.db.data['guilds'][str(guild_id)] = {'urls': {}}
-        if 'urls' not in self.bot.db.data['guilds'][str(guild_id)]:
-            self.bot.db.data['guilds'][str(guild_id)]['urls'] = {}
-        return self.bot.db.data['guilds'][str(guild_id)]
+        guild_data = self.bot.db.section('guilds', guild_id, {'urls': {}})
+        if 'urls' not in guild_data:
+            guild_data['urls'] = {}
+        return guild_data
     
     @app_commands.command(name='shorten', description='Shorten a long URL')
     @app_commands.describe(
@@ -48,17 +55,18 @@ class Utility(commands.Cog):
         
         guild_data = self.get_guild_data(interaction.guild_id)
         
-        for existing_code, stored_url in guild_data['urls'].items():
-            if stored_url == url:
-                shortened = f"https://{self.domain}/{existing_code}"
-                embed = discord.Embed(title='URL Already Shortened', color=0x5865F2)
-                embed.add_field(name='Original', value=url[:100] + ('...' if len(url) > 100 else ''), inline=False)
-                embed.add_field(name='Shortened', value=shortened, inline=False)
-                await interaction.response.send_message(embed=embed)
-                return
+        existing_code = self.bot.db.links.find(interaction.guild_id, url)
+        if existing_code:
+            shortened = f"https://{self.domain}/{existing_code}"
+            embed = discord.Embed(title='URL Already Shortened', color=0x5865F2)
+            embed.add_field(name='Original', value=url[:100] + ('...' if len(url) > 100 else ''), inline=False)
+            embed.add_field(name='Shortened', value=shortened, inline=False)
+            await interaction.response.send_message(embed=embed)
+            return
         
         if code:
-            if code in guild_data['urls']:
+            # codes resolve on one shared domain, so a custom code has to be free in every server
+            if code in self.bot.db.links or code in guild_data['urls']:
                 await interaction.response.send_message(
                     'This short code is already taken',
                     ephemeral=True
@@ -66,11 +74,10 @@ class Utility(commands.Cog):
                 return
         else:
             code = self.generate_short_code()
-            while code in guild_data['urls']:
-                code = self.generate_short_code()
         
         guild_data['urls'][code] = url
-        self.bot.db.save()
+        self.bot.db.mark('guilds', interaction.guild_id, 'urls', code)
+        self.bot.db.links.add(interaction.guild_id, code, url)
         
         shortened = f"https://{self.domain}/{code}"
         
@@ -110,9 +117,10 @@ class Utility(commands.Cog):
             if count >= 25:
                 break
             shortened = f"https://{self.domain}/{code}"
+            clicks = self.bot.db.clicks.summary(interaction.guild_id, code)['total']
             embed.add_field(
                 name=code,
-                value=f"{url[:50]}{'...' if len(url) > 50 else ''}\n{shortened}",
+                value=f"{url[:50]}{'...' if len(url) > 50 else ''}\n{shortened} • {clicks:,} clicks",
                 inline=False
             )
             count += 1
@@ -130,7 +138,10 @@ class Utility(commands.Cog):
         if code in guild_data['urls']:
             url = guild_data['urls'][code]
             del guild_data['urls'][code]
-            self.bot.db.save()
+            self.bot.db.mark('guilds', interaction.guild_id, 'urls', code)
+            if guild_data.get('clicks', {}).pop(code, None):
+                self.bot.db.mark('guilds', interaction.guild_id, 'clicks', code)
+            self.bot.db.links.remove(interaction.guild_id, code)
             
             embed = discord.Embed(title='URL Deleted', color=0x5865F2)
             embed.add_field(name='Code', value=code, inline=False)
@@ -138,6 +149,30 @@ class Utility(commands.Cog):
             await interaction.response.send_message(embed=embed)
         else:
             await interaction.response.send_message('Short code not found', ephemeral=True)
+    
+    @app_commands.command(name='shortstats', description='Show click stats for a shortened URL')
+    @app_commands.describe(code='The short code to show stats for')
+    async def short_stats(self, interaction: discord.Interaction, code: str):
+        guild_data = self.get_guild_data(interaction.guild_id)
+        
+        if code not in guild_data['urls']:
+            await interaction.response.send_message('Short code not found', ephemeral=True)
+            return
+        
+        stats = self.bot.db.clicks.summary(interaction.guild_id, code)
+        embed = discord.Embed(title=f'Stats for {code}', color=0x5865F2)
+        embed.add_field(name='Original URL', value=guild_data['urls'][code][:1024], inline=False)
+        embed.add_field(name='Total Clicks', value=f"{stats['total']:,}", inline=True)
+        embed.add_field(name='Last Click', value=f"<t:{int(stats['last'])}:R>" if stats['last'] else 'Never', inline=True)
+        
+        today = datetime.now(timezone.utc).date()
+        days = [(today - timedelta(days=i)).isoformat() for i in range(6, -1, -1)]
+        counts = [stats['days'].get(day, 0) for day in days]
+        peak = max(counts) or 1
+        history = '\n'.join(f"`{day[5:]}` {'█' * round(count / peak * 10) or '·'} {count:,}" for day, count in zip(days, counts))
+        embed.add_field(name='Last 7 Days', value=history, inline=False)
+        
+        await interaction.response.send_message(embed=embed)
 
 async def setup(bot):
     await bot.add_cog(Utility(bot))
\ No newline at end of file
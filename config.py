@@ -0,0 +1,160 @@
+import tomllib
+from dataclasses import MISSING, dataclass, fields, replace
+
+class ConfigError(ValueError):
+    pass
+
+@dataclass(frozen=True)
+class BotConfig:
+    data_file: str
+    enabled_cogs: tuple
+    command_sync_file: str = 'command_sync.json'
+
+@dataclass(frozen=True)
+class XPConfig:
+    min: int
+    max: int
+    cooldown: float
+    per_level: int
+    level_up_multiplier: int
+
+@dataclass(frozen=True)
+class WebConfig:
+    video_check_interval: float
+    port: int
+    # None means video_check_interval, which keeps the fixed interval older configs had
+    video_max_interval: float = None
+    video_fetch_concurrency: int = 10
+    redirect_workers: int = 0
+    redirect_table: str = 'redirects.idx'
+
+@dataclass(frozen=True)
+class OutboundConfig:
+    rate: float = 1.0
+    burst: int = 5
+    queue_size: int = 20
+
+@dataclass(frozen=True)
+class WebSubConfig:
+    hub: str = 'https://pubsubhubbub.appspot.com/subscribe'
+    public_url: str = ''
+    lease: int = 432000
+    reconcile_interval: float = 21600.0
+    internal_port: int = 3001
+
+@dataclass(frozen=True)
+class StorageConfig:
+    engine: str = 'json'
+    sqlite_file: str = 'data.db'
+    journal_max_mb: float = 8.0
+    shard_dir: str = 'shards'
+    shard_cache_mb: float = 64.0
+    flush_interval: float = 5.0
+    flush_threshold: int = 500
+    ledger_file: str = 'ledger.jsonl'
+
+@dataclass(frozen=True)
+class Config:
+    bot: BotConfig
+    xp: XPConfig
+    web: WebConfig
+    outbound: OutboundConfig
+    websub: WebSubConfig
+    storage: StorageConfig
+
+RESTART_FIELDS = (
+    'bot.data_file', 'bot.enabled_cogs', 'web.video_fetch_concurrency', 'web.port', 'web.redirect_workers', 'web.redirect_table',
+    'websub.hub', 'websub.public_url', 'websub.internal_port',
+    'storage.engine', 'storage.sqlite_file', 'storage.journal_max_mb', 'storage.shard_dir',
+    'storage.shard_cache_mb', 'storage.ledger_file'
+)
+
+ENGINES = ('json', 'journal', 'sqlite', 'sharded')
+
+def convert(value, kind, name):
+    # bool is an int to python, but `cooldown = true` is always a mistake
+    if kind is float and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if kind is int and isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if kind is str and isinstance(value, str):
+        return value
+    if kind is tuple and isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return tuple(value)
+    expected = {int: 'a whole number', float: 'a number', str: 'a string', tuple: 'a list of strings'}[kind]
+    raise ConfigError(f'{name} should be {expected}, got {value!r}')
+
+def build(cls, data, section):
+    if data is None:
+        data = {}
+    if not isinstance(data, dict):
+        raise ConfigError(f'[{section}] should be a table')
+    unknown = set(data) - {field.name for field in fields(cls)}
+    if unknown:
+        raise ConfigError(f'Unknown key in [{section}]: {", ".join(sorted(unknown))}')
+    missing = [field.name for field in fields(cls) if field.name not in data and field.default is MISSING]
+    if missing:
+        raise ConfigError(f'[{section}] is missing {", ".join(missing)}')
+    
+    values = {}
+    for field in fields(cls):
+        if field.name in data:
+            values[field.name] = convert(data[field.name], field.type, f'{section}.{field.name}')
+    return cls(**values)
+
+def validate(config):
+    if not 0 <= config.xp.min <= config.xp.max:
+        raise ConfigError('xp.min has to be between 0 and xp.max')
+    if config.xp.per_level <= 0:
+        raise ConfigError('xp.per_level has to be positive')
+    if config.xp.cooldown < 0 or config.xp.level_up_multiplier < 0:
+        raise ConfigError('xp.cooldown and xp.level_up_multiplier can\'t be negative')
+    if config.web.video_check_interval <= 0:
+        raise ConfigError('web.video_check_interval has to be positive')
+    if config.web.video_max_interval < config.web.video_check_interval:
+        raise ConfigError('web.video_max_interval can\'t be below video_check_interval')
+    if config.web.video_fetch_concurrency < 1:
+        raise ConfigError('web.video_fetch_concurrency has to be at least 1')
+    if config.web.redirect_workers < 0:
+        raise ConfigError('web.redirect_workers can\'t be negative')
+    if config.outbound.rate <= 0 or config.outbound.burst < 1 or config.outbound.queue_size < 1:
+        raise ConfigError('outbound.rate has to be positive and burst and queue_size at least 1')
+    for name, url in (('websub.hub', config.websub.hub), ('websub.public_url', config.websub.public_url)):
+        if url and not url.startswith(('http://', 'https://')):
+            raise ConfigError(f'{name} has to be an http:// or https:// url')
+    if config.websub.public_url and not config.websub.hub:
+        raise ConfigError('websub.hub is needed when websub.public_url is set')
+    if config.websub.lease <= 0:
+        raise ConfigError('websub.lease has to be positive')
+    if config.websub.reconcile_interval < config.web.video_check_interval:
+        raise ConfigError('websub.reconcile_interval can\'t be below web.video_check_interval')
+    if not 0 < config.websub.internal_port < 65536:
+        raise ConfigError('websub.internal_port has to be a port number')
+    if config.storage.engine not in ENGINES:
+        raise ConfigError(f'storage.engine has to be one of {", ".join(ENGINES)}')
+    if config.storage.flush_interval <= 0 or config.storage.flush_threshold < 1:
+        raise ConfigError('storage.flush_interval has to be positive and flush_threshold at least 1')
+
+def load_config(path):
+    try:
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    except tomllib.TOMLDecodeError as e:
+        raise ConfigError(f'{path} is not valid TOML: {e}')
+    
+    unknown = set(data) - {field.name for field in fields(Config)}
+    if unknown:
+        raise ConfigError(f'Unknown section: {", ".join(sorted(unknown))}')
+    config = Config(**{field.name: build(field.type, data.get(field.name), field.name) for field in fields(Config)})
+    if config.web.video_max_interval is None:
+        config = replace(config, web=replace(config.web, video_max_interval=config.web.video_check_interval))
+    validate(config)
+    return config
+
+def restart_needed(old, new):
+    changed = []
+    for path in RESTART_FIELDS:
+        section, name = path.split('.')
+        if getattr(getattr(old, section), name) != getattr(getattr(new, section), name):
+            changed.append(path)
+    return changed
\ No newline at end of file
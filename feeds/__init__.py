@@ -0,0 +1,3 @@
+from .poller import FeedPoller, latest_video
+from .scheduler import FeedScheduler
+from .websub import WebSubscriber
\ No newline at end of file
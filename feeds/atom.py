@@ -0,0 +1,36 @@
+from xml.etree.ElementTree import XMLPullParser
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+YT = '{http://www.youtube.com/xml/schemas/2015}'
+MEDIA = '{http://search.yahoo.com/mrss/}'
+
+CHUNK = 4096
+
+def entry_video(entry):
+    video_id = entry.findtext(f'{YT}videoId') or (entry.findtext(f'{ATOM}id') or '').split(':')[-1]
+    title = entry.findtext(f'{ATOM}title')
+    link = entry.find(f'{ATOM}link[@rel="alternate"]')
+    if link is None:
+        link = entry.find(f'{ATOM}link')
+    if not video_id or title is None or link is None:
+        raise ValueError('Entry is missing its id, title or link')
+    
+    thumbnail = entry.find(f'{MEDIA}group/{MEDIA}thumbnail')
+    return {
+        'video_id': video_id,
+        'title': title,
+        'link': link.get('href'),
+        'author': entry.findtext(f'{ATOM}author/{ATOM}name'),
+        'published': entry.findtext(f'{ATOM}published'),
+        'thumbnail': thumbnail.get('url') if thumbnail is not None else None
+    }
+
+def newest_entry(body):
+    parser = XMLPullParser(events=('end',))
+    for start in range(0, len(body), CHUNK):
+        parser.feed(body[start:start + CHUNK])
+        for event, element in parser.read_events():
+            if element.tag == f'{ATOM}entry':
+                return entry_video(element)
+    parser.close()
+    return None
\ No newline at end of file
@@ -0,0 +1,117 @@
+import asyncio
+import hashlib
+import time
+import logging
+from xml.etree.ElementTree import ParseError
+import aiohttp
+import feedparser
+from .atom import newest_entry
+
+logger = logging.getLogger('bot')
+
+FEED_URL = 'https://www.youtube.com/feeds/videos.xml?channel_id={}'
+
+def feed_digest(body):
+    # view and rating counts further down change every fetch, the newest entry up to its
+    # publish date only changes with a new upload or an edited title
+    start = body.find(b'<entry>')
+    end = body.find(b'</published>', start)
+    if start != -1 and end != -1:
+        body = body[start:end]
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+def feedparser_video(body):
+    feed = feedparser.parse(body)
+    if not feed.entries:
+        return None
+    
+    latest = feed.entries[0]
+    return {
+        'video_id': latest.yt_videoid if hasattr(latest, 'yt_videoid') else latest.id.split(':')[-1],
+        'title': latest.title,
+        'link': latest.link,
+        'author': latest.get('author'),
+        'published': latest.get('published'),
+        'thumbnail': latest.media_thumbnail[0]['url'] if latest.get('media_thumbnail') else None
+    }
+
+def latest_video(body):
+    try:
+        return newest_entry(body)
+    except (ParseError, ValueError) as e:
+        logger.debug(f'Falling back to feedparser: {e}')
+        return feedparser_video(body)
+
+class CachedFeed:
+    __slots__ = ('etag', 'last_modified', 'digest', 'video', 'fetched')
+    
+    def __init__(self, etag, last_modified, digest, video, fetched):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest
+        self.video = video
+        self.fetched = fetched
+
+class FeedPoller:
+    def __init__(self, concurrency=10, timeout=20):
+        self.concurrency = concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.session = None
+        self.semaphore = None
+        self.cache = {}
+        self.stats = {'requests': 0, 'not_modified': 0, 'unchanged': 0, 'parsed': 0, 'cached': 0, 'bytes': 0}
+    
+    def prune(self, channel_ids):
+        for channel_id in set(self.cache) - set(channel_ids):
+            del self.cache[channel_id]
+    
+    async def fetch(self, channel_id, max_age=None):
+        now = time.monotonic()
+        entry = self.cache.get(channel_id)
+        if entry is not None and max_age is not None and now - entry.fetched < max_age:
+            self.stats['cached'] += 1
+            return entry.video
+        
+        headers = {}
+        if entry is not None and entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        
+        if self.session is None:
+            self.session = aiohttp.ClientSession(timeout=self.timeout)
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async with self.semaphore:
+            self.stats['requests'] += 1
+            async with self.session.get(FEED_URL.format(channel_id), headers=headers) as resp:
+                if resp.status == 304 and entry is not None:
+                    entry.fetched = now
+                    self.stats['not_modified'] += 1
+                    return entry.video
+                resp.raise_for_status()
+                body = await resp.read()
+                etag = resp.headers.get('ETag')
+                last_modified = resp.headers.get('Last-Modified')
+        
+        self.stats['bytes'] += len(body)
+        digest = feed_digest(body)
+        if entry is not None and entry.digest == digest:
+            entry.etag, entry.last_modified, entry.fetched = etag, last_modified, now
+            self.stats['unchanged'] += 1
+            return entry.video
+        
+        video = await asyncio.to_thread(latest_video, body)
+        self.cache[channel_id] = CachedFeed(etag, last_modified, digest, video, now)
+        self.stats['parsed'] += 1
+        return video
+    
+    async def fetch_all(self, channel_ids):
+        channel_ids = list(channel_ids)
+        results = await asyncio.gather(*(self.fetch(channel_id) for channel_id in channel_ids), return_exceptions=True)
+        return dict(zip(channel_ids, results))
+    
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
\ No newline at end of file
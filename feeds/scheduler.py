@@ -0,0 +1,88 @@
+import heapq
+import random
+
+GROWTH = 1.5
+JITTER = 0.1
+
+class FeedState:
+    __slots__ = ('due', 'interval', 'errors', 'video_id', 'pushed')
+    
+    def __init__(self, due, interval):
+        self.due = due
+        self.interval = interval
+        self.errors = 0
+        self.video_id = None
+        self.pushed = False
+
+class FeedScheduler:
+    def __init__(self, base_interval, max_interval, reconcile_interval=None):
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.reconcile_interval = reconcile_interval or max_interval
+        self.feeds = {}
+        self.heap = []
+    
+    def __len__(self):
+        return len(self.feeds)
+    
+    def configure(self, base_interval, max_interval, reconcile_interval=None):
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.reconcile_interval = reconcile_interval or max_interval
+    
+    def jitter(self, delay):
+        return delay * random.uniform(1 - JITTER, 1 + JITTER)
+    
+    def push(self, channel_id, state, due):
+        state.due = due
+        heapq.heappush(self.heap, (due, channel_id))
+    
+    def sync(self, channel_ids, now):
+        for channel_id in set(self.feeds) - set(channel_ids):
+            del self.feeds[channel_id]
+        for channel_id in channel_ids:
+            if channel_id not in self.feeds:
+                state = self.feeds[channel_id] = FeedState(0, self.base_interval)
+                self.push(channel_id, state, now + random.uniform(0, self.base_interval))
+    
+    def set_pushed(self, channel_id, pushed, now):
+        state = self.feeds.get(channel_id)
+        if state is None or state.pushed == pushed:
+            return
+        state.pushed = pushed
+        due = now + self.jitter(self.base_interval)
+        if not pushed and due < state.due:
+            self.push(channel_id, state, due)
+    
+    def due(self, now):
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            when, channel_id = heapq.heappop(self.heap)
+            state = self.feeds.get(channel_id)
+            if state is not None and state.due == when:
+                due.append(channel_id)
+        return due
+    
+    def next_due(self):
+        return self.heap[0][0] if self.heap else None
+    
+    def done(self, channel_id, now, video_id=None, error=False):
+        state = self.feeds.get(channel_id)
+        if state is None:
+            return
+        
+        if error:
+            state.errors += 1
+            # the exponent is capped, a feed that 404s for weeks would otherwise overflow the float
+            delay = min(self.base_interval * 2 ** min(state.errors, 16), self.max_interval)
+        else:
+            state.errors = 0
+            if video_id is not None and state.video_id is not None and video_id != state.video_id:
+                state.interval = self.base_interval
+            else:
+                state.interval = state.interval * GROWTH
+            state.interval = min(max(state.interval, self.base_interval), self.max_interval)
+            if video_id is not None:
+                state.video_id = video_id
+            delay = self.reconcile_interval if state.pushed else state.interval
+        self.push(channel_id, state, now + self.jitter(delay))
\ No newline at end of file
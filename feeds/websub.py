@@ -0,0 +1,158 @@
+import asyncio
+import hmac
+import logging
+import time
+import aiohttp
+from aiohttp import web
+from .poller import latest_video
+
+logger = logging.getLogger('bot')
+
+TOPIC_URL = 'https://www.youtube.com/xml/feeds/videos.xml?channel_id={}'
+RENEW_AT = 0.8
+RETRY_INTERVAL = 300
+MAX_RETRY_INTERVAL = 3600
+SIGNATURES = ('sha1', 'sha256', 'sha384', 'sha512')
+
+class Subscription:
+    __slots__ = ('renew', 'expires', 'failures', 'pending')
+    
+    def __init__(self):
+        self.renew = 0
+        self.expires = 0
+        self.failures = 0
+        self.pending = False
+
+class WebSubscriber:
+    def __init__(self, hub, public_url, secret, lease, on_video, concurrency=10, timeout=20):
+        self.hub = hub
+        self.public_url = public_url.rstrip('/')
+        self.secret = secret
+        self.lease = lease
+        self.on_video = on_video
+        self.concurrency = concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.session = None
+        self.semaphore = None
+        self.listening = False
+        self.subscriptions = {}
+        self.leaving = set()
+        self.stats = {'requests': 0, 'failed': 0, 'verified': 0, 'denied': 0, 'deliveries': 0, 'rejected': 0}
+    
+    def callback(self, channel_id):
+        return f'{self.public_url}/websub/{channel_id}'
+    
+    def active(self, channel_id, now):
+        subscription = self.subscriptions.get(channel_id)
+        return subscription is not None and subscription.expires > now
+    
+    async def sync(self, channel_ids, now):
+        if not self.listening:
+            return
+        
+        requests = []
+        for channel_id in set(self.subscriptions) - set(channel_ids):
+            del self.subscriptions[channel_id]
+            self.leaving.add(channel_id)
+            requests.append((channel_id, 'unsubscribe'))
+        for channel_id in channel_ids:
+            subscription = self.subscriptions.get(channel_id)
+            if subscription is None:
+                subscription = self.subscriptions[channel_id] = Subscription()
+            if subscription.renew > now:
+                continue
+            subscription.renew = now + min(RETRY_INTERVAL * 2 ** subscription.failures, MAX_RETRY_INTERVAL)
+            subscription.failures += 1
+            subscription.pending = True
+            requests.append((channel_id, 'subscribe'))
+        
+        if requests:
+            await asyncio.gather(*(self.request(channel_id, mode) for channel_id, mode in requests))
+    
+    async def request(self, channel_id, mode):
+        data = {
+            'hub.callback': self.callback(channel_id),
+            'hub.mode': mode,
+            'hub.topic': TOPIC_URL.format(channel_id),
+            'hub.verify': 'async'
+        }
+        if mode == 'subscribe':
+            data['hub.secret'] = self.secret
+            data['hub.lease_seconds'] = str(int(self.lease))
+        
+        if self.session is None:
+            self.session = aiohttp.ClientSession(timeout=self.timeout)
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async with self.semaphore:
+            self.stats['requests'] += 1
+            try:
+                async with self.session.post(self.hub, data=data) as resp:
+                    if resp.status in (202, 204):
+                        return
+                    reason = f'{resp.status} {(await resp.text())[:200]}'
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                reason = str(e) or type(e).__name__
+        self.stats['failed'] += 1
+        logger.warning(f'WebSub {mode} for YouTube channel {channel_id} failed: {reason}')
+    
+    async def verify(self, request):
+        channel_id = request.match_info['channel_id']
+        query = request.query
+        mode = query.get('hub.mode')
+        if query.get('hub.topic') != TOPIC_URL.format(channel_id):
+            return web.Response(status=404)
+        
+        if mode == 'denied':
+            self.stats['denied'] += 1
+            logger.warning(f'WebSub hub denied YouTube channel {channel_id}: {query.get("hub.reason")}')
+            return web.Response(text='')
+        
+        # only requests we sent ourselves are confirmed, so nobody else can swap our secret or unsubscribe us
+        subscription = self.subscriptions.get(channel_id)
+        if mode == 'subscribe' and subscription is not None and subscription.pending:
+            try:
+                lease = int(query.get('hub.lease_seconds', self.lease))
+            except ValueError:
+                lease = self.lease
+            now = time.monotonic()
+            subscription.expires = now + lease
+            subscription.renew = now + lease * RENEW_AT
+            subscription.failures = 0
+            subscription.pending = False
+            self.stats['verified'] += 1
+        elif mode == 'unsubscribe' and channel_id in self.leaving:
+            self.leaving.discard(channel_id)
+        else:
+            return web.Response(status=404)
+        return web.Response(text=query.get('hub.challenge', ''))
+    
+    def signed(self, body, header):
+        method, _, signature = header.partition('=')
+        if method not in SIGNATURES:
+            return False
+        return hmac.compare_digest(hmac.new(self.secret.encode(), body, method).hexdigest(), signature)
+    
+    async def deliver(self, request):
+        channel_id = request.match_info['channel_id']
+        body = await request.read()
+        self.stats['deliveries'] += 1
+        # a bad signature is still acknowledged, as the spec suggests, so a forger learns nothing from the answer
+        if channel_id not in self.subscriptions or not self.signed(body, request.headers.get('X-Hub-Signature', '')):
+            self.stats['rejected'] += 1
+            return web.Response(status=204)
+        
+        try:
+            video = await asyncio.to_thread(latest_video, body)
+        except Exception as e:
+            logger.error(f'Error parsing WebSub delivery for YouTube channel {channel_id}: {e}')
+            return web.Response(status=204)
+        if video is not None:
+            self.on_video(channel_id, video)
+        return web.Response(status=204)
+    
+    async def close(self):
+        self.listening = False
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
\ No newline at end of file
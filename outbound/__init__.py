@@ -0,0 +1 @@
+from .dispatcher import Dispatcher, TokenBucket
\ No newline at end of file
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger('bot')
+
+MAX_CONTENT = 2000
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+    
+    def wait(self, now, tokens=1):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return max(tokens - self.tokens, 0) / self.rate
+    
+    def take(self):
+        self.tokens -= 1
+
+class Outgoing:
+    __slots__ = ('content', 'embed', 'merge_key')
+    
+    def __init__(self, content, embed, merge_key):
+        self.content = content
+        self.embed = embed
+        self.merge_key = merge_key
+
+class ChannelQueue:
+    def __init__(self, channel, rate, burst):
+        self.channel = channel
+        self.bucket = TokenBucket(rate, burst)
+        self.items = deque()
+        self.wake = asyncio.Event()
+        self.task = None
+
+class Dispatcher:
+    def __init__(self, rate=1, burst=5, queue_size=20):
+        self.rate = rate
+        self.burst = burst
+        self.queue_size = queue_size
+        self.queues = {}
+        self.closed = False
+        self.stats = {'queued': 0, 'sent': 0, 'merged': 0, 'dropped': 0, 'failed': 0}
+    
+    def configure(self, rate, burst, queue_size):
+        self.rate = rate
+        self.burst = burst
+        self.queue_size = queue_size
+        for queue in self.queues.values():
+            queue.bucket.rate = rate
+            queue.bucket.burst = burst
+    
+    def depth(self):
+        return sum(len(queue.items) for queue in self.queues.values())
+    
+    def submit(self, channel, content=None, embed=None, merge_key=None):
+        if self.closed:
+            self.stats['dropped'] += 1
+            return False
+        queue = self.queues.get(channel.id)
+        if queue is None:
+            queue = self.queues[channel.id] = ChannelQueue(channel, self.rate, self.burst)
+            queue.task = asyncio.create_task(self.drain(queue))
+        
+        if merge_key is not None and queue.items:
+            last = queue.items[-1]
+            if last.merge_key == merge_key and last.embed is None and embed is None and len(last.content) + len(content) < MAX_CONTENT:
+                last.content += '\n' + content
+                self.stats['merged'] += 1
+                return True
+        
+        if len(queue.items) >= self.queue_size:
+            self.stats['dropped'] += 1
+            logger.warning(f'Outbound queue for #{channel} is full, dropped a message')
+            return False
+        
+        queue.items.append(Outgoing(content, embed, merge_key))
+        self.stats['queued'] += 1
+        queue.wake.set()
+        return True
+    
+    async def drain(self, queue):
+        try:
+            while True:
+                if not queue.items:
+                    # linger until the bucket refills, otherwise a fresh queue could burst past discord's limit
+                    idle = queue.bucket.wait(time.monotonic(), self.burst)
+                    if not idle:
+                        break
+                    queue.wake.clear()
+                    try:
+                        await asyncio.wait_for(queue.wake.wait(), idle)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                
+                delay = queue.bucket.wait(time.monotonic())
+                if delay:
+                    await asyncio.sleep(delay)
+                    continue
+                
+                queue.bucket.take()
+                item = queue.items.popleft()
+                try:
+                    await queue.channel.send(item.content, embed=item.embed)
+                    self.stats['sent'] += 1
+                except Exception as e:
+                    self.stats['failed'] += 1
+                    logger.error(f'Could not send to #{queue.channel}: {e!r}')
+        finally:
+            self.stats['dropped'] += len(queue.items)
+            self.queues.pop(queue.channel.id, None)
+    
+    async def close(self, timeout=5):
+        self.closed = True
+        tasks = [queue.task for queue in self.queues.values()]
+        if not tasks:
+            return
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
\ No newline at end of file
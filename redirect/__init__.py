@@ -0,0 +1,2 @@
+from .table import RedirectTable, publish
+from .pool import RedirectWorkers
\ No newline at end of file
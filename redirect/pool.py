@@ -0,0 +1,88 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+from .table import publish
+
+logger = logging.getLogger('bot')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE_LIMIT = 4 * 1024 * 1024
+
+class RedirectWorkers:
+    def __init__(self, links, clicks, table_path, port, count, upstream=None):
+        self.links = links
+        self.clicks = clicks
+        self.table_path = os.path.abspath(table_path)
+        self.port = port
+        self.count = count
+        self.upstream = upstream
+        self.published = None
+        self.procs = {}
+        self.tasks = []
+        self.closing = False
+    
+    async def start(self):
+        await self.publish()
+        self.tasks = [asyncio.create_task(self.supervise(i)) for i in range(self.count)]
+        self.tasks.append(asyncio.create_task(self.republish_loop()))
+    
+    async def publish(self):
+        version = self.links.version
+        # copy on the loop so the publishing thread never sees the dict change under it
+        snapshot = list(self.links.urls.items())
+        size = await asyncio.to_thread(publish, self.table_path, snapshot)
+        self.published = version
+        logger.debug(f'Published {len(snapshot)} links ({size:,} bytes) to {self.table_path}')
+    
+    async def republish_loop(self):
+        while True:
+            await asyncio.sleep(1)
+            if self.links.version == self.published:
+                continue
+            try:
+                await self.publish()
+            except Exception as e:
+                logger.error(f'Error publishing redirect table: {e}')
+    
+    async def supervise(self, i):
+        while not self.closing:
+            args = ['--port', str(self.port), '--table', self.table_path]
+            if self.upstream:
+                args += ['--upstream', self.upstream]
+            proc = await asyncio.create_subprocess_exec(
+                sys.executable, '-m', 'redirect.worker', *args,
+                cwd=ROOT, stdout=asyncio.subprocess.PIPE, limit=LINE_LIMIT
+            )
+            self.procs[i] = proc
+            await self.read_clicks(proc)
+            code = await proc.wait()
+            if self.closing:
+                break
+            logger.warning(f'Redirect worker {i} exited with {code}, restarting in 5s')
+            await asyncio.sleep(5)
+    
+    async def read_clicks(self, proc):
+        while True:
+            try:
+                line = await proc.stdout.readline()
+            except ValueError as e:
+                # readline has already thrown the oversized line away, so keep reading or the worker blocks on a full pipe
+                logger.error(f'Skipped an oversized click report from redirect worker {proc.pid}: {e}')
+                continue
+            if not line:
+                break
+            try:
+                batch = json.loads(line)
+                self.clicks.merge(batch['clicks'], batch['last'])
+            except Exception as e:
+                logger.error(f'Bad click report from redirect worker {proc.pid}: {e}')
+    
+    async def stop(self):
+        self.closing = True
+        self.tasks[-1].cancel()
+        for proc in self.procs.values():
+            if proc.returncode is None:
+                proc.terminate()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
\ No newline at end of file
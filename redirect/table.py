@@ -0,0 +1,89 @@
+import mmap
+import os
+import struct
+import zlib
+from storage.files import write_atomic
+
+# layout: header, then a power-of-two array of (crc32, entry offset + 1) slots with linear probing,
+# then the entries themselves as (code length, url length, code, url)
+MAGIC = b'RDX1'
+HEADER = struct.Struct('<4sII')
+SLOT = struct.Struct('<II')
+ENTRY = struct.Struct('<HI')
+
+def build(links):
+    entries = [(code.encode(), url.encode()) for code, url in links]
+    slots = 8
+    while slots < len(entries) * 2:
+        slots *= 2
+    mask = slots - 1
+    
+    table = bytearray(slots * SLOT.size)
+    blob = bytearray()
+    data_start = HEADER.size + len(table)
+    for code, url in entries:
+        crc = zlib.crc32(code)
+        i = crc & mask
+        while SLOT.unpack_from(table, i * SLOT.size)[1]:
+            i = (i + 1) & mask
+        SLOT.pack_into(table, i * SLOT.size, crc, data_start + len(blob) + 1)
+        blob += ENTRY.pack(len(code), len(url)) + code + url
+    return HEADER.pack(MAGIC, slots, len(entries)) + bytes(table) + bytes(blob)
+
+def publish(path, links):
+    payload = build(links)
+    write_atomic(path, payload, sync=False)
+    return len(payload)
+
+class RedirectTable:
+    def __init__(self, path):
+        self.path = path
+        self.map = None
+        self.identity = None
+        self.mask = 0
+        self.refresh()
+    
+    def refresh(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if identity == self.identity:
+            return False
+        
+        with open(self.path, 'rb') as f:
+            new_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, slots, _ = HEADER.unpack_from(new_map, 0)
+        if magic != MAGIC:
+            new_map.close()
+            raise ValueError(f'{self.path} is not a redirect table')
+        
+        old_map, self.map = self.map, new_map
+        self.mask = slots - 1
+        self.identity = identity
+        if old_map is not None:
+            old_map.close()
+        return True
+    
+    def __len__(self):
+        return HEADER.unpack_from(self.map, 0)[2] if self.map else 0
+    
+    def resolve(self, code):
+        if self.map is None:
+            return None
+        key = code.encode()
+        crc = zlib.crc32(key)
+        i = crc & self.mask
+        while True:
+            slot_crc, offset = SLOT.unpack_from(self.map, HEADER.size + i * SLOT.size)
+            if not offset:
+                return None
+            if slot_crc == crc:
+                start = offset - 1
+                code_len, url_len = ENTRY.unpack_from(self.map, start)
+                start += ENTRY.size
+                if self.map[start:start + code_len] == key:
+                    start += code_len
+                    return self.map[start:start + url_len].decode()
+            i = (i + 1) & self.mask
\ No newline at end of file
@@ -0,0 +1,104 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+import aiohttp
+from aiohttp import web
+from .table import RedirectTable
+from storage.clicks import ClickBuffer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger('bot')
+
+async def health_check(request):
+    return web.Response(text="Bot is running!")
+
+async def redirect_handler(request):
+    code = request.match_info.get('code', '')
+    url = request.app['table'].resolve(code)
+    if url is None:
+        return web.Response(text='Not Found', status=404)
+    request.app['clicks'].record(code)
+    return web.Response(status=301, headers={'Location': url})
+
+REPORT_CODES = 500
+
+PROXY_HEADERS = ('Content-Type', 'X-Hub-Signature', 'Link')
+
+async def proxy_handler(request):
+    headers = {name: request.headers[name] for name in PROXY_HEADERS if name in request.headers}
+    url = f'{request.app["upstream"]}{request.path_qs}'
+    try:
+        async with request.app['session'].request(request.method, url, headers=headers, data=await request.read()) as resp:
+            return web.Response(status=resp.status, body=await resp.read(), content_type=resp.content_type)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error(f'Error passing {request.path} to the bot: {e}')
+        return web.Response(text='Bad Gateway', status=502)
+
+def report_clicks(clicks):
+    counts, last = clicks.drain()
+    codes = list(counts)
+    for start in range(0, len(codes), REPORT_CODES):
+        chunk = codes[start:start + REPORT_CODES]
+        batch = {'clicks': {code: counts[code] for code in chunk}, 'last': {code: last[code] for code in chunk if code in last}}
+        sys.stdout.write(json.dumps(batch) + '\n')
+    if codes:
+        sys.stdout.flush()
+
+async def serve(host, port, table_path, upstream=None):
+    table = RedirectTable(table_path)
+    app = web.Application()
+    app['table'] = table
+    app['clicks'] = clicks = ClickBuffer()
+    app.router.add_get('/', health_check)
+    app.router.add_get('/health', health_check)
+    if upstream:
+        app['upstream'] = upstream
+        app['session'] = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+        app.router.add_route('*', '/websub/{tail:.*}', proxy_handler)
+    app.router.add_get('/{code}', redirect_handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port, reuse_port=True).start()
+    logger.info(f'Redirect worker {os.getpid()} serving {len(table)} links on port {port}')
+    
+    stop = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+    parent = os.getppid()
+    ticks = 0
+    while os.getppid() == parent:
+        try:
+            await asyncio.wait_for(stop.wait(), 1)
+        except asyncio.TimeoutError:
+            pass
+        if stop.is_set():
+            # the bot stops us with SIGTERM and keeps reading until we exit, so hand over the last clicks
+            report_clicks(clicks)
+            break
+        ticks += 1
+        if ticks % 5 == 0:
+            report_clicks(clicks)
+        try:
+            if table.refresh():
+                logger.debug(f'Redirect worker {os.getpid()} reloaded {len(table)} links')
+        except Exception as e:
+            logger.error(f'Error reloading {table_path}: {e}')
+    else:
+        logger.info(f'Redirect worker {os.getpid()} exiting, the bot process is gone')
+    if upstream:
+        await app['session'].close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve short link redirects from a published redirect table')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, required=True)
+    parser.add_argument('--table', required=True)
+    parser.add_argument('--upstream', help='where the bot\'s own server listens, /websub/ requests are passed on to it')
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.table, args.upstream))
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
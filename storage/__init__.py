@@ -0,0 +1,19 @@
+from .db import SimpleDB
+from .bank import TransactionError, InsufficientFunds, OnCooldown
+from .files import write_atomic
+from .json_engine import JSONEngine
+from .journal_engine import JournalEngine
+from .sqlite_engine import SQLiteEngine
+from .sharded_engine import ShardedEngine
+
+def create_engine(config):
+    engine = config.storage.engine
+    if engine == 'json':
+        return JSONEngine(config.bot.data_file)
+    if engine == 'journal':
+        return JournalEngine(config.bot.data_file, int(config.storage.journal_max_mb * 1024 * 1024))
+    if engine == 'sqlite':
+        return SQLiteEngine(config.storage.sqlite_file)
+    if engine == 'sharded':
+        return ShardedEngine(config.storage.shard_dir, int(config.storage.shard_cache_mb * 1024 * 1024))
+    raise ValueError(f'Unknown storage engine: {engine}')
\ No newline at end of file
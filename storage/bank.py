@@ -0,0 +1,120 @@
+import asyncio
+import contextlib
+import json
+import os
+import threading
+import time
+
+LOCK_STRIPES = 64
+
+class TransactionError(Exception):
+    pass
+
+class InsufficientFunds(TransactionError):
+    def __init__(self, account, available):
+        super().__init__(f'Only {available:,} coins in {account}')
+        self.account = account
+        self.available = available
+
+class OnCooldown(TransactionError):
+    def __init__(self, remaining):
+        super().__init__(f'On cooldown for {remaining:.0f}s')
+        self.remaining = remaining
+
+class Ledger:
+    def __init__(self, filename):
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.buffer = []
+    
+    def record(self, guild_id, user_id, reason, coins, bank, record, ref=None):
+        entry = {
+            't': round(time.time(), 3), 'g': int(guild_id), 'u': int(user_id), 'reason': reason,
+            'coins': coins, 'bank': bank, 'balance': [record.coins, record.bank]
+        }
+        if ref is not None:
+            entry['ref'] = int(ref)
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        with self.lock:
+            self.buffer.append(line)
+    
+    def flush(self):
+        with self.lock:
+            lines, self.buffer = self.buffer, []
+        if not lines:
+            return 0
+        
+        payload = ''.join(lines).encode()
+        try:
+            with open(self.filename, 'ab') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception:
+            with self.lock:
+                self.buffer[:0] = lines
+            raise
+        return len(payload)
+
+class Bank:
+    def __init__(self, db, ledger):
+        self.db = db
+        self.ledger = ledger
+        self.locks = [asyncio.Lock() for _ in range(LOCK_STRIPES)]
+    
+    def stripe(self, guild_id, user_id):
+        return hash((int(guild_id), int(user_id))) % LOCK_STRIPES
+    
+    def busy(self, guild_id, user_id):
+        return self.locks[self.stripe(guild_id, user_id)].locked()
+    
+    @contextlib.asynccontextmanager
+    async def locked(self, guild_id, *user_ids):
+        # stripes are always taken in index order, so two transfers between the same users can't deadlock
+        stripes = sorted({self.stripe(guild_id, user_id) for user_id in user_ids})
+        async with contextlib.AsyncExitStack() as stack:
+            for stripe in stripes:
+                await stack.enter_async_context(self.locks[stripe])
+            yield
+    
+    def check(self, record, coins=0, bank=0, cooldown=None, now=None):
+        if cooldown is not None:
+            field, seconds = cooldown
+            remaining = getattr(record, field) + seconds - now
+            if remaining > 0:
+                raise OnCooldown(remaining)
+        if record.coins + coins < 0:
+            raise InsufficientFunds('wallet', record.coins)
+        if record.bank + bank < 0:
+            raise InsufficientFunds('bank', record.bank)
+    
+    def apply(self, guild_id, user_id, reason, coins=0, bank=0, cooldown=None, ref=None):
+        # callers outside a coroutine (the XP batch) use this directly and must skip users that are busy()
+        now = time.time()
+        record = self.db.get_user(guild_id, user_id)
+        self.check(record, coins, bank, cooldown, now)
+        record.coins += coins
+        record.bank += bank
+        if cooldown is not None:
+            setattr(record, cooldown[0], now)
+        self.db.set_user(guild_id, user_id, record)
+        self.ledger.record(guild_id, user_id, reason, coins, bank, record, ref)
+        return record
+    
+    async def reward(self, guild_id, user_id, amount, reason, cooldown=None):
+        async with self.locked(guild_id, user_id):
+            return self.apply(guild_id, user_id, reason, coins=amount, cooldown=cooldown)
+    
+    async def deposit(self, guild_id, user_id, amount):
+        async with self.locked(guild_id, user_id):
+            return self.apply(guild_id, user_id, 'deposit', coins=-amount, bank=amount)
+    
+    async def withdraw(self, guild_id, user_id, amount):
+        async with self.locked(guild_id, user_id):
+            return self.apply(guild_id, user_id, 'withdraw', coins=amount, bank=-amount)
+    
+    async def transfer(self, guild_id, sender_id, receiver_id, amount):
+        async with self.locked(guild_id, sender_id, receiver_id):
+            sender = self.apply(guild_id, sender_id, 'pay', coins=-amount, ref=receiver_id)
+            receiver = self.apply(guild_id, receiver_id, 'paid', coins=amount, ref=sender_id)
+            return sender, receiver
\ No newline at end of file
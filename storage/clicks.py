@@ -0,0 +1,73 @@
+import time
+from datetime import datetime, timezone
+
+HISTORY_DAYS = 30
+
+def day_key(day):
+    return datetime.fromtimestamp(day * 86400, timezone.utc).strftime('%Y-%m-%d')
+
+class ClickBuffer:
+    def __init__(self):
+        self.pending = {}
+        self.last = {}
+    
+    def record(self, code):
+        now = time.time()
+        day = int(now // 86400)
+        days = self.pending.get(code)
+        if days is None:
+            days = self.pending[code] = {}
+        days[day] = days.get(day, 0) + 1
+        self.last[code] = now
+    
+    def merge(self, counts, last):
+        for code, days in counts.items():
+            pending = self.pending.setdefault(code, {})
+            for day, count in days.items():
+                pending[int(day)] = pending.get(int(day), 0) + count
+        for code, clicked in last.items():
+            if clicked > self.last.get(code, 0):
+                self.last[code] = clicked
+    
+    def drain(self):
+        pending, self.pending = self.pending, {}
+        last, self.last = self.last, {}
+        return pending, last
+
+class ClickStats(ClickBuffer):
+    def __init__(self, db):
+        super().__init__()
+        self.db = db
+    
+    def flush(self):
+        pending, last = self.drain()
+        cutoff = day_key(int(time.time() // 86400) - HISTORY_DAYS)
+        for code, days in pending.items():
+            guild_id = self.db.links.owner(code)
+            if guild_id is None:
+                continue
+            guild_data = self.db.section('guilds', guild_id, {'urls': {}})
+            stats = guild_data.setdefault('clicks', {}).setdefault(code, {'total': 0, 'last': 0, 'days': {}})
+            for day, count in days.items():
+                key = day_key(day)
+                stats['days'][key] = stats['days'].get(key, 0) + count
+                stats['total'] += count
+            stats['last'] = max(stats['last'], last.get(code, 0))
+            if len(stats['days']) > HISTORY_DAYS:
+                stats['days'] = {day: count for day, count in stats['days'].items() if day > cutoff}
+            self.db.mark('guilds', guild_id, 'clicks', code)
+        return len(pending)
+    
+    def summary(self, guild_id, code):
+        guild_data = self.db.section('guilds', guild_id) or {}
+        stored = guild_data.get('clicks', {}).get(code, {})
+        total = stored.get('total', 0)
+        days = dict(stored.get('days', {}))
+        last = stored.get('last', 0)
+        if self.db.links.owner(code) == str(guild_id):
+            for day, count in self.pending.get(code, {}).items():
+                key = day_key(day)
+                days[key] = days.get(key, 0) + count
+                total += count
+            last = max(last, self.last.get(code, 0))
+        return {'total': total, 'last': last, 'days': days}
\ No newline at end of file
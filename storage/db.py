@@ -0,0 +1,139 @@
+import logging
+import threading
+import time
+from .ranking import RankingIndex, PAGE_SIZE
+from .totals import TotalsIndex
+from .shortlinks import ShortLinkIndex
+from .reactionroles import ReactionRoleIndex
+from .clicks import ClickStats
+from .bank import Bank, Ledger
+
+logger = logging.getLogger('bot')
+
+class SimpleDB:
+    def __init__(self, engine, flush_interval=5, flush_threshold=500, ledger_file='ledger.jsonl'):
+        self.engine = engine
+        self.rankings = RankingIndex(engine)
+        self.totals = TotalsIndex(engine)
+        sources = engine.index_sources({'guilds': 'urls', 'reaction_roles': None})
+        self.links = ShortLinkIndex(sources['guilds'])
+        logger.info(f'Indexed {len(self.links):,} short links')
+        self.reaction_roles = ReactionRoleIndex(sources['reaction_roles'])
+        self.clicks = ClickStats(self)
+        self.bank = Bank(self, Ledger(ledger_file))
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        # changes is only bumped on the event loop and flushed only by the writer, so neither needs a lock
+        self.changes = 0
+        self.flushed = 0
+        self.stats = {
+            'flushes': 0, 'last_flush_ms': 0.0, 'total_flush_ms': 0.0,
+            'last_bytes': 0, 'bytes_written': 0, 'errors': 0
+        }
+        self.flush_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.closed = False
+        self.writer = threading.Thread(target=self.run_writer, name='db-writer', daemon=True)
+        self.writer.start()
+    
+    def mark_dirty(self):
+        self.changes += 1
+        if self.changes - self.flushed >= self.flush_threshold:
+            self.wake.set()
+    
+    def save(self):
+        self.engine.mark_all()
+        self.mark_dirty()
+    
+    def flush(self):
+        with self.flush_lock:
+            changes = self.changes
+            if changes == self.flushed:
+                return
+            
+            start = time.perf_counter()
+            written = self.bank.ledger.flush()
+            written += self.engine.flush()
+            self.flushed = changes
+            
+            elapsed = (time.perf_counter() - start) * 1000
+            self.stats['flushes'] += 1
+            self.stats['last_flush_ms'] = elapsed
+            self.stats['total_flush_ms'] += elapsed
+            self.stats['last_bytes'] = written
+            self.stats['bytes_written'] += written
+            logger.debug(f'Flushed {type(self.engine).__name__}: {written:,} bytes in {elapsed:.1f}ms')
+    
+    def run_writer(self):
+        while not self.closed:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f'Error flushing database: {e}')
+    
+    def close(self):
+        self.clicks.flush()
+        self.closed = True
+        self.wake.set()
+        self.writer.join()
+        self.flush()
+        self.engine.close()
+    
+    def get_user(self, guild_id, user_id):
+        return self.engine.get_user(int(guild_id), int(user_id))
+    
+    def set_user(self, guild_id, user_id, record):
+        self.engine.put_user(int(guild_id), int(user_id), record)
+        self.rankings.update(int(guild_id), int(user_id), record)
+        self.totals.update(int(guild_id), int(user_id), record)
+        self.mark_dirty()
+    
+    def rank(self, guild_id, user_id, sort='level'):
+        ranking = self.rankings.get(int(guild_id), sort)
+        position = ranking.position(int(user_id))
+        return (None if position is None else position + 1), len(ranking)
+    
+    def leaderboard(self, guild_id, limit=10, offset=0, sort='level'):
+        ranking = self.rankings.get(int(guild_id), sort)
+        return [(user_id, self.engine.get_user(int(guild_id), user_id)) for user_id in ranking.page(offset, limit)]
+    
+    def leaderboard_page(self, guild_id, page, sort, render):
+        ranking = self.rankings.get(int(guild_id), sort)
+        page = min(max(page, 0), max(0, (len(ranking) - 1) // PAGE_SIZE))
+        rendered = ranking.pages.get(page)
+        if rendered is None:
+            offset = page * PAGE_SIZE
+            rendered = ranking.pages[page] = render(sort, offset, self.leaderboard(guild_id, PAGE_SIZE, offset, sort), len(ranking))
+        return rendered, len(ranking), page
+    
+    def economy(self, guild_id, top=10):
+        totals = self.totals.get(int(guild_id))
+        order = self.rankings.get(int(guild_id), 'wealth').order
+        median = -(order[(len(order) - 1) // 2][0] + order[len(order) // 2][0]) / 2 if order else 0
+        top_wealth = -sum(entry[0] for entry in order[:top])
+        total = totals.coins + totals.bank
+        return {
+            'users': len(order), 'coins': totals.coins, 'bank': totals.bank, 'total': total,
+            'median': median, 'top': min(top, len(order)), 'top_share': top_wealth / total if total else 0
+        }
+    
+    def section(self, name, guild_id, default=None):
+        value = self.engine.get_section(name, str(guild_id))
+        if value is None and default is not None:
+            value = default
+            self.set_section(name, guild_id, value)
+        return value
+    
+    def sections(self, name):
+        return self.engine.sections(name)
+    
+    def set_section(self, name, guild_id, value):
+        self.engine.set_section(name, str(guild_id), value)
+        self.mark(name, guild_id)
+    
+    def mark(self, name, guild_id, *path):
+        self.engine.mark_section(name, str(guild_id), tuple(str(key) for key in path))
+        self.mark_dirty()
\ No newline at end of file
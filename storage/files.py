@@ -0,0 +1,16 @@
+import os
+
+def write_atomic(path, payload, sync=True):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(payload)
+        if sync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def index_parts(sections, parts):
+    return {
+        name: [(guild_id, value.get(key) if key is not None else value) for guild_id, value in sections(name)]
+        for name, key in parts.items()
+    }
\ No newline at end of file
@@ -0,0 +1,106 @@
+import json
+import os
+import threading
+import logging
+from .json_engine import JSONEngine
+from .records import UserRecord, split_key
+
+logger = logging.getLogger('bot')
+
+class JournalEngine(JSONEngine):
+    def __init__(self, filename, max_journal_bytes):
+        super().__init__(filename)
+        self.journal = f'{filename}.journal'
+        self.max_journal_bytes = max_journal_bytes
+        self.lock = threading.Lock()
+        self.buffer = []
+        self.compact_requested = False
+        self.journal_bytes = self.replay()
+    
+    def replay(self):
+        if not os.path.exists(self.journal):
+            return 0
+        
+        applied = 0
+        good = 0
+        with open(self.journal, 'rb') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError('missing newline')
+                    op = json.loads(line)
+                except ValueError:
+                    # a crash mid-append leaves a torn last entry, cut it off so new appends start clean
+                    logger.warning(f'Dropping a torn entry in {self.journal} after {applied} changes')
+                    break
+                self.apply(op)
+                applied += 1
+                good += len(line)
+        if good != os.path.getsize(self.journal):
+            os.truncate(self.journal, good)
+        logger.info(f'Replayed {applied} changes from {self.journal}')
+        return good
+    
+    def apply(self, op):
+        if 'u' in op:
+            guild_id, user_id = split_key(op['u'])
+            self.users.setdefault(guild_id, {})[user_id] = UserRecord.from_dict(op['v'])
+            return
+        
+        keys = [op['g'], *op['p']]
+        target = self.data.setdefault(op['s'], {})
+        for key in keys[:-1]:
+            target = target.setdefault(key, {})
+        if op.get('d'):
+            target.pop(keys[-1], None)
+        else:
+            target[keys[-1]] = op['v']
+    
+    def log(self, op):
+        line = json.dumps(op, separators=(',', ':')) + '\n'
+        with self.lock:
+            self.buffer.append(line)
+    
+    def put_user(self, guild_id, user_id, record):
+        super().put_user(guild_id, user_id, record)
+        self.log({'u': f"{guild_id}_{user_id}", 'v': record.to_dict()})
+    
+    def set_section(self, name, guild_id, value):
+        super().set_section(name, guild_id, value)
+        self.log({'s': name, 'g': guild_id, 'p': [], 'v': value})
+    
+    def mark_section(self, name, guild_id, path=()):
+        value = self.data.get(name, {})
+        for key in (guild_id, *path):
+            if not isinstance(value, dict) or key not in value:
+                self.log({'s': name, 'g': guild_id, 'p': list(path), 'd': 1})
+                return
+            value = value[key]
+        self.log({'s': name, 'g': guild_id, 'p': list(path), 'v': value})
+    
+    def mark_all(self):
+        self.compact_requested = True
+    
+    def flush(self):
+        with self.lock:
+            lines, self.buffer = self.buffer, []
+        
+        written = 0
+        if lines:
+            payload = ''.join(lines).encode()
+            with open(self.journal, 'ab') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            written += len(payload)
+            self.journal_bytes += len(payload)
+        
+        if self.compact_requested or self.journal_bytes > self.max_journal_bytes:
+            # changes logged after this point may already be in the snapshot; replaying them again is harmless
+            self.compact_requested = False
+            written += super().flush()
+            with open(self.journal, 'wb') as f:
+                os.fsync(f.fileno())
+            logger.info(f'Compacted {self.journal_bytes:,} journal bytes into {self.filename}')
+            self.journal_bytes = 0
+        return written
\ No newline at end of file
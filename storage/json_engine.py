@@ -0,0 +1,81 @@
+import json
+import os
+import logging
+from .records import UserRecord, split_key
+from .files import index_parts, write_atomic
+
+logger = logging.getLogger('bot')
+
+class JSONEngine:
+    def __init__(self, filename):
+        self.filename = filename
+        self.data = self.load()
+        self.users = {}
+        for key, user in self.data.pop('users', {}).items():
+            guild_id, user_id = split_key(key)
+            self.users.setdefault(guild_id, {})[user_id] = UserRecord.from_dict(user)
+    
+    def load(self):
+        if os.path.exists(self.filename):
+            try:
+                with open(self.filename, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.error(f'Could not read {self.filename}: {e}')
+        return {'users': {}, 'guilds': {}}
+    
+    def get_user(self, guild_id, user_id):
+        users = self.users.get(guild_id)
+        if users is None:
+            users = self.users[guild_id] = {}
+        record = users.get(user_id)
+        if record is None:
+            record = users[user_id] = UserRecord()
+        return record
+    
+    def put_user(self, guild_id, user_id, record):
+        self.users.setdefault(guild_id, {})[user_id] = record
+    
+    def guild_ids(self):
+        return list(self.users)
+    
+    def guild_users(self, guild_id):
+        return list(self.users.get(guild_id, {}).items())
+    
+    def get_section(self, name, guild_id):
+        return self.data.get(name, {}).get(guild_id)
+    
+    def set_section(self, name, guild_id, value):
+        self.data.setdefault(name, {})[guild_id] = value
+    
+    def mark_section(self, name, guild_id, path=()):
+        pass
+    
+    def mark_all(self):
+        pass
+    
+    def sections(self, name):
+        return list(self.data.get(name, {}).items())
+    
+    def index_sources(self, parts):
+        return index_parts(self.sections, parts)
+    
+    def encode(self):
+        # the C encoder only runs without indent and never yields the GIL, so the sections are a consistent snapshot
+        sections = json.dumps(self.data, separators=(',', ':'))
+        users = ','.join(
+            f'"{guild_id}_{user_id}":{record.to_json()}'
+            for guild_id, guild_users in list(self.users.items())
+            for user_id, record in list(guild_users.items())
+        )
+        if sections == '{}':
+            return f'{{"users":{{{users}}}}}'.encode()
+        return f'{{"users":{{{users}}},{sections[1:]}'.encode()
+    
+    def flush(self):
+        payload = self.encode()
+        write_atomic(self.filename, payload)
+        return len(payload)
+    
+    def close(self):
+        pass
\ No newline at end of file
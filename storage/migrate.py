@@ -0,0 +1,48 @@
+import argparse
+import json
+import os
+import sys
+from .sqlite_engine import SQLiteEngine
+from .sharded_engine import ShardedEngine
+from .records import UserRecord, split_key
+
+def migrate(json_file, engine):
+    with open(json_file, 'r') as f:
+        data = json.load(f)
+    
+    for key, user in data.get('users', {}).items():
+        guild_id, user_id = split_key(key)
+        engine.put_user(guild_id, user_id, UserRecord.from_dict(user))
+    
+    sections = 0
+    for name, section in data.items():
+        if name == 'users' or not isinstance(section, dict):
+            continue
+        for guild_id, value in section.items():
+            engine.set_section(name, guild_id, value)
+            sections += 1
+    
+    engine.flush()
+    engine.close()
+    return len(data.get('users', {})), sections
+
+def main():
+    parser = argparse.ArgumentParser(description='Copy data.json into another storage engine')
+    parser.add_argument('json_file', nargs='?', default='data.json')
+    parser.add_argument('target', nargs='?', default='data.db', help='SQLite file or shard directory')
+    parser.add_argument('--engine', choices=('sqlite', 'sharded'), default='sqlite')
+    args = parser.parse_args()
+    
+    if os.path.exists(args.target):
+        sys.exit(f'{args.target} already exists, refusing to overwrite it')
+    
+    if args.engine == 'sqlite':
+        engine = SQLiteEngine(args.target)
+    else:
+        engine = ShardedEngine(args.target, 0)
+    
+    users, sections = migrate(args.json_file, engine)
+    print(f'Migrated {users:,} users and {sections:,} guild sections into {args.target}')
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,74 @@
+from bisect import bisect_left
+
+# entries sort ascending, so scores are negated to put the highest first; ties go to the lower user id
+SORT_KEYS = {
+    'level': lambda user_id, record: (-record.level, -record.xp, user_id),
+    'coins': lambda user_id, record: (-record.coins, user_id),
+    'wealth': lambda user_id, record: (-(record.coins + record.bank), user_id),
+}
+
+PAGE_SIZE = 10
+
+class GuildRanking:
+    def __init__(self, users, sort):
+        self.entry = SORT_KEYS[sort]
+        self.keys = {user_id: self.entry(user_id, record) for user_id, record in users}
+        self.order = sorted(self.keys.values())
+        self.pages = {}
+    
+    def __len__(self):
+        return len(self.order)
+    
+    def update(self, user_id, record):
+        # bisect finds both spots in O(log n), but del/insert shift the tail of the list, so an update is O(n):
+        # about 40us at 100k users in one guild and 400us at 1M
+        new = self.entry(user_id, record)
+        old = self.keys.get(user_id)
+        if old == new:
+            position = bisect_left(self.order, new)
+            self.invalidate(position, position)
+            return position, position
+        
+        if old is None:
+            old_position = len(self.order)
+        else:
+            old_position = bisect_left(self.order, old)
+            del self.order[old_position]
+        new_position = bisect_left(self.order, new)
+        self.order.insert(new_position, new)
+        self.keys[user_id] = new
+        self.invalidate(min(old_position, new_position), max(old_position, new_position))
+        return old_position, new_position
+    
+    def invalidate(self, first, last):
+        if not self.pages:
+            return
+        for page in range(first // PAGE_SIZE, last // PAGE_SIZE + 1):
+            self.pages.pop(page, None)
+    
+    def position(self, user_id):
+        key = self.keys.get(user_id)
+        if key is None:
+            return None
+        return bisect_left(self.order, key)
+    
+    def page(self, offset, limit):
+        return [entry[-1] for entry in self.order[offset:offset + limit]]
+
+class RankingIndex:
+    def __init__(self, engine):
+        self.engine = engine
+        self.guilds = {}
+    
+    def get(self, guild_id, sort='level'):
+        rankings = self.guilds.setdefault(guild_id, {})
+        ranking = rankings.get(sort)
+        if ranking is None:
+            ranking = rankings[sort] = GuildRanking(self.engine.guild_users(guild_id), sort)
+        return ranking
+    
+    def update(self, guild_id, user_id, record):
+        changes = {}
+        for sort, ranking in self.guilds.get(guild_id, {}).items():
+            changes[sort] = ranking.update(user_id, record)
+        return changes
\ No newline at end of file
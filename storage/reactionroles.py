@@ -0,0 +1,22 @@
+class ReactionRoleIndex:
+    def __init__(self, guilds):
+        self.messages = {}
+        for guild_id, reactions in guilds:
+            for message_id, emojis in reactions.items():
+                self.set_message(message_id, emojis)
+    
+    def __len__(self):
+        return len(self.messages)
+    
+    def __contains__(self, message_id):
+        return message_id in self.messages
+    
+    def set_message(self, message_id, emojis):
+        if emojis:
+            self.messages[int(message_id)] = {emoji: int(role_id) for emoji, role_id in emojis.items()}
+        else:
+            self.messages.pop(int(message_id), None)
+    
+    def role(self, message_id, emoji):
+        emojis = self.messages.get(message_id)
+        return emojis.get(emoji) if emojis else None
\ No newline at end of file
@@ -0,0 +1,40 @@
+USER_DEFAULTS = {
+    'coins': 0, 'bank': 0, 'level': 1, 'xp': 0,
+    'last_message': 0, 'last_daily': 0, 'last_work': 0
+}
+USER_FIELDS = tuple(USER_DEFAULTS)
+
+# same fields in the same order as the dicts in data.json, which keeps the encoded file identical
+JSON_TEMPLATE = '{' + ','.join(f'"{field}":%r' for field in USER_FIELDS) + '}'
+
+class UserRecord:
+    __slots__ = USER_FIELDS
+    
+    def __init__(self, coins=0, bank=0, level=1, xp=0, last_message=0, last_daily=0, last_work=0):
+        self.coins = coins
+        self.bank = bank
+        self.level = level
+        self.xp = xp
+        self.last_message = last_message
+        self.last_daily = last_daily
+        self.last_work = last_work
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(*(data.get(field, default) for field, default in USER_DEFAULTS.items()))
+    
+    def astuple(self):
+        return (self.coins, self.bank, self.level, self.xp, self.last_message, self.last_daily, self.last_work)
+    
+    def to_dict(self):
+        return dict(zip(USER_FIELDS, self.astuple()))
+    
+    def to_json(self):
+        return JSON_TEMPLATE % self.astuple()
+    
+    def __repr__(self):
+        return f'UserRecord({", ".join(f"{field}={value!r}" for field, value in zip(USER_FIELDS, self.astuple()))})'
+
+def split_key(key):
+    guild_id, user_id = key.split('_', 1)
+    return int(guild_id), int(user_id)
\ No newline at end of file
@@ -0,0 +1,112 @@
+import argparse
+import math
+import sys
+from config import load_config
+from . import create_engine
+from .bank import Ledger
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# reaching level L takes per_level * (1 + 2 + ... + L-1) XP, so a user's total is
+# per_level * L*(L-1)/2 plus whatever sits in their xp field
+def total_xp(level, xp, per_level):
+    return per_level * level * (level - 1) // 2 + xp
+
+# a level-up to level L pays L * multiplier, so levels 2..L paid multiplier * (L*(L+1)/2 - 1)
+def level_rewards(level, multiplier):
+    return multiplier * (level * (level + 1) // 2 - 1)
+
+def solve_level(total, per_level):
+    q = 2 * total // per_level
+    return (1 + math.isqrt(4 * q + 1)) // 2
+
+def relevel_python(levels, xps, old_per_level, new_per_level):
+    new_levels, new_xps = [], []
+    for level, xp in zip(levels, xps):
+        total = total_xp(level, xp, old_per_level)
+        new_level = solve_level(total, new_per_level)
+        new_levels.append(new_level)
+        new_xps.append(total - total_xp(new_level, 0, new_per_level))
+    return new_levels, new_xps
+
+def relevel_numpy(levels, xps, old_per_level, new_per_level):
+    levels = np.asarray(levels, dtype=np.int64)
+    total = total_xp(levels, np.asarray(xps, dtype=np.int64), old_per_level)
+    q = 2 * total // new_per_level
+    new_levels = (1 + np.sqrt(4 * q + 1).astype(np.int64)) // 2
+    # float sqrt can land one off for large totals, nudge back onto the exact answer
+    new_levels -= new_levels * (new_levels - 1) > q
+    new_levels += (new_levels + 1) * new_levels <= q
+    return new_levels.tolist(), (total - total_xp(new_levels, 0, new_per_level)).tolist()
+
+def relevel(users, old, new, coins=False):
+    levels = [int(record.level) for guild_id, user_id, record in users]
+    xps = [int(record.xp) for guild_id, user_id, record in users]
+    solve = relevel_numpy if np is not None else relevel_python
+    new_levels, new_xps = solve(levels, xps, old['per_level'], new['per_level'])
+    
+    changes = []
+    for (guild_id, user_id, record), level, xp, new_level, new_xp in zip(users, levels, xps, new_levels, new_xps):
+        coin_delta = 0
+        if coins:
+            coin_delta = level_rewards(new_level, new['level_up_multiplier']) - level_rewards(level, old['level_up_multiplier'])
+            coin_delta = max(coin_delta, -record.coins)
+        if new_level != level or new_xp != xp or coin_delta:
+            changes.append((guild_id, user_id, record, new_level, new_xp, coin_delta))
+    return changes
+
+def report(users, changes, limit=10):
+    up = sum(1 for guild_id, user_id, record, level, xp, coins in changes if level > record.level)
+    down = sum(1 for guild_id, user_id, record, level, xp, coins in changes if level < record.level)
+    print(f'{len(users):,} users scanned, {len(changes):,} changed ({up:,} level up, {down:,} level down)')
+    print(f'Coins: {sum(change[5] for change in changes):+,} in total')
+    
+    biggest = sorted(changes, key=lambda change: abs(change[3] - change[2].level), reverse=True)[:limit]
+    if biggest:
+        print('Biggest moves:')
+    for guild_id, user_id, record, level, xp, coins in biggest:
+        print(f'  {guild_id}/{user_id}: level {record.level} ({record.xp:,} XP) -> {level} ({xp:,} XP), coins {coins:+,}')
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompute every level after changing the [xp] curve in config.toml')
+    parser.add_argument('--config', default='config.toml')
+    parser.add_argument('--old-per-level', type=int, required=True, help='per_level the stored levels were earned under')
+    parser.add_argument('--old-multiplier', type=int, help='level_up_multiplier the coins were paid under (default: same as config)')
+    parser.add_argument('--coins', action='store_true', help='also pay out or take back the level-up coin rewards')
+    parser.add_argument('--dry-run', action='store_true', help='only print what would change')
+    args = parser.parse_args()
+    
+    config = load_config(args.config)
+    new = {'per_level': config.xp.per_level, 'level_up_multiplier': config.xp.level_up_multiplier}
+    old = {'per_level': args.old_per_level, 'level_up_multiplier': args.old_multiplier if args.old_multiplier is not None else new['level_up_multiplier']}
+    if old['per_level'] <= 0:
+        sys.exit('per_level has to be positive')
+    
+    engine = create_engine(config)
+    users = [(guild_id, user_id, record) for guild_id in engine.guild_ids() for user_id, record in engine.guild_users(guild_id)]
+    changes = relevel(users, old, new, args.coins)
+    report(users, changes)
+    
+    if args.dry_run or not changes:
+        engine.close()
+        return
+    
+    ledger = Ledger(config.storage.ledger_file)
+    for guild_id, user_id, record, level, xp, coins in changes:
+        record.level = level
+        record.xp = xp
+        record.coins += coins
+        engine.put_user(guild_id, user_id, record)
+        if coins:
+            ledger.record(guild_id, user_id, 'relevel', coins, 0, record)
+    ledger.flush()
+    engine.mark_all()
+    engine.flush()
+    engine.close()
+    print(f'Wrote {len(changes):,} users')
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
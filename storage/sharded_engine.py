@@ -0,0 +1,207 @@
+import json
+import os
+import threading
+import logging
+from collections import OrderedDict
+from .records import UserRecord
+from .files import write_atomic
+
+logger = logging.getLogger('bot')
+
+GLOBAL_SECTIONS = ('youtube', 'meta')
+INDEX_KEY = '_index'
+USER_BYTES = 120
+
+def encode_record(value):
+    if isinstance(value, UserRecord):
+        return value.to_dict()
+    raise TypeError(f'Cannot encode {type(value).__name__}')
+
+def decode_shard(shard):
+    shard['users'] = {int(user_id): UserRecord.from_dict(user) for user_id, user in shard.get('users', {}).items()}
+    return shard
+
+class ShardedEngine:
+    def __init__(self, directory, cache_bytes):
+        self.directory = directory
+        self.cache_bytes = cache_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.global_file = os.path.join(directory, '_global.json')
+        self.global_data = self.read(self.global_file) or {}
+        self.global_dirty = False
+        self.indexed = {}
+        self.known = {int(name[:-5]) for name in os.listdir(directory) if name.endswith('.json') and not name.startswith('_')}
+        self.shards = OrderedDict()
+        self.sizes = {}
+        self.lock = threading.Lock()
+        self.dirty = set()
+        self.flushing = set()
+        self.stats = {'loads': 0, 'evictions': 0}
+    
+    def path(self, guild_id):
+        return os.path.join(self.directory, f'{guild_id}.json')
+    
+    def read(self, path):
+        try:
+            with open(path, 'rb') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f'Could not read {path}: {e}')
+            return None
+    
+    def shard(self, guild_id):
+        shard = self.shards.get(guild_id)
+        if shard is not None:
+            self.shards.move_to_end(guild_id)
+            return shard
+        
+        shard = self.read(self.path(guild_id)) if guild_id in self.known else None
+        shard = decode_shard(shard or {})
+        self.shards[guild_id] = shard
+        self.sizes[guild_id] = os.path.getsize(self.path(guild_id)) if guild_id in self.known else 0
+        self.stats['loads'] += 1
+        self.evict(guild_id)
+        return shard
+    
+    def evict(self, keep):
+        with self.lock:
+            sizes = {guild_id: self.size(guild_id, shard) for guild_id, shard in self.shards.items()}
+            total = sum(sizes.values())
+            for guild_id in list(self.shards):
+                if total <= self.cache_bytes:
+                    break
+                if guild_id == keep or guild_id in self.dirty or guild_id in self.flushing:
+                    continue
+                del self.shards[guild_id]
+                total -= sizes[guild_id]
+                self.stats['evictions'] += 1
+    
+    def size(self, guild_id, shard):
+        return max(self.sizes.get(guild_id, 0), len(shard['users']) * USER_BYTES)
+    
+    def mark_shard(self, guild_id):
+        with self.lock:
+            self.dirty.add(guild_id)
+    
+    def get_user(self, guild_id, user_id):
+        users = self.shard(guild_id)['users']
+        record = users.get(user_id)
+        if record is None:
+            record = users[user_id] = UserRecord()
+        return record
+    
+    def put_user(self, guild_id, user_id, record):
+        self.shard(guild_id)['users'][user_id] = record
+        self.mark_shard(guild_id)
+    
+    def guild_ids(self):
+        return sorted(self.known | set(self.shards))
+    
+    def guild_users(self, guild_id):
+        return list(self.shard(guild_id)['users'].items())
+    
+    def get_section(self, name, guild_id):
+        if name in GLOBAL_SECTIONS:
+            return self.global_data.get(name, {}).get(str(guild_id))
+        return self.shard(int(guild_id)).get(name)
+    
+    def set_section(self, name, guild_id, value):
+        if name in GLOBAL_SECTIONS:
+            self.global_data.setdefault(name, {})[str(guild_id)] = value
+        else:
+            self.shard(int(guild_id))[name] = value
+        self.mark_section(name, guild_id)
+    
+    def mark_section(self, name, guild_id, path=()):
+        if name in GLOBAL_SECTIONS:
+            self.global_dirty = True
+            return
+        key = self.indexed.get(name)
+        # click counts change all the time and aren't indexed, only touching the mirrored part rewrites the global file
+        if name in self.indexed and (key is None or not path or path[0] == key):
+            self.mirror(name, str(guild_id), self.shard(int(guild_id)).get(name))
+            self.global_dirty = True
+        self.mark_shard(int(guild_id))
+    
+    def mark_all(self):
+        self.global_dirty = True
+        for guild_id, shard in list(self.shards.items()):
+            for name in self.indexed:
+                self.mirror(name, str(guild_id), shard.get(name))
+        with self.lock:
+            self.dirty.update(self.shards)
+    
+    def sections(self, name):
+        if name in GLOBAL_SECTIONS:
+            return list(self.global_data.get(name, {}).items())
+        return list(self.scan(name))
+    
+    def mirror(self, name, guild_id, value):
+        key = self.indexed[name]
+        if value is not None and key is not None:
+            value = value.get(key)
+        if value:
+            self.global_data[INDEX_KEY][name][guild_id] = value
+        else:
+            self.global_data[INDEX_KEY][name].pop(guild_id, None)
+    
+    def index_sources(self, parts):
+        self.indexed.update(parts)
+        index = self.global_data.setdefault(INDEX_KEY, {})
+        missing = [name for name in parts if name not in index]
+        if missing:
+            for name in missing:
+                index[name] = {}
+            for guild_id in sorted(self.known | set(self.shards)):
+                shard = self.shards.get(guild_id) or self.read(self.path(guild_id)) or {}
+                for name in missing:
+                    self.mirror(name, str(guild_id), shard.get(name))
+            # written right away, the db only flushes once something changed and the next start would scan again
+            write_atomic(self.global_file, json.dumps(self.global_data, separators=(',', ':')).encode())
+            logger.info(f'Indexed {", ".join(missing)} from {len(self.known)} shards into {self.global_file}')
+        return {name: list(index[name].items()) for name in parts}
+    
+    def scan(self, name):
+        # idle guilds are read straight from disk and not kept, so a full scan doesn't flush the cache
+        for guild_id in sorted(self.known | set(self.shards)):
+            shard = self.shards.get(guild_id)
+            if shard is None:
+                shard = self.read(self.path(guild_id)) or {}
+            if name in shard:
+                yield str(guild_id), shard[name]
+    
+    def flush(self):
+        with self.lock:
+            dirty, self.dirty = self.dirty, set()
+            self.flushing = dirty
+        global_dirty, self.global_dirty = self.global_dirty, False
+        
+        written = 0
+        try:
+            for guild_id in dirty:
+                shard = self.shards.get(guild_id)
+                if shard is None:
+                    continue
+                payload = json.dumps(shard, separators=(',', ':'), default=encode_record).encode()
+                write_atomic(self.path(guild_id), payload)
+                self.sizes[guild_id] = len(payload)
+                self.known.add(guild_id)
+                written += len(payload)
+            if global_dirty:
+                payload = json.dumps(self.global_data, separators=(',', ':')).encode()
+                write_atomic(self.global_file, payload)
+                written += len(payload)
+        except Exception:
+            with self.lock:
+                self.dirty |= dirty
+            self.global_dirty = self.global_dirty or global_dirty
+            raise
+        finally:
+            with self.lock:
+                self.flushing = set()
+        return written
+    
+    def close(self):
+        pass
\ No newline at end of file
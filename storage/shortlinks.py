@@ -0,0 +1,94 @@
+import string
+from urllib.parse import urlsplit, urlunsplit
+
+ALPHABET = string.ascii_letters + string.digits
+CODE_LENGTH = 6
+# any step coprime with 62 (odd, not a multiple of 31) maps the counter onto every code exactly once;
+# one near 62**6 / golden ratio spreads consecutive codes across the whole space
+CODE_STEP = 35104476157
+CODE_OFFSET = 625454969
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def encode_code(n):
+    length = CODE_LENGTH
+    while n >= len(ALPHABET) ** length:
+        n -= len(ALPHABET) ** length
+        length += 1
+    value = (n * CODE_STEP + CODE_OFFSET) % len(ALPHABET) ** length
+    chars = []
+    for _ in range(length):
+        value, digit = divmod(value, len(ALPHABET))
+        chars.append(ALPHABET[digit])
+    return ''.join(chars)
+
+def normalize_url(url):
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    userinfo, _, _ = parts.netloc.rpartition('@')
+    netloc = (parts.hostname or '').lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port is not None and DEFAULT_PORTS.get(scheme) != port:
+        netloc = f'{netloc}:{port}'
+    if userinfo:
+        netloc = f'{userinfo}@{netloc}'
+    return urlunsplit((scheme, netloc, parts.path or '/', parts.query, parts.fragment))
+
+class ShortLinkIndex:
+    def __init__(self, guild_urls):
+        self.urls = {}
+        self.version = 0
+        # older data can have the same code in several guilds, the first one stored wins like the old scan did
+        self.owners = {}
+        self.by_url = {}
+        for guild_id, urls in guild_urls:
+            for code, url in (urls or {}).items():
+                self.add(guild_id, code, url)
+    
+    def __len__(self):
+        return len(self.urls)
+    
+    def __contains__(self, code):
+        return code in self.urls
+    
+    def add(self, guild_id, code, url):
+        owners = self.owners.setdefault(code, {})
+        owners[str(guild_id)] = url
+        self.urls[code] = next(iter(owners.values()))
+        self.by_url.setdefault((str(guild_id), normalize_url(url)), code)
+        self.version += 1
+    
+    def remove(self, guild_id, code):
+        owners = self.owners.get(code)
+        if not owners or str(guild_id) not in owners:
+            return
+        url = owners.pop(str(guild_id))
+        key = (str(guild_id), normalize_url(url))
+        if self.by_url.get(key) == code:
+            del self.by_url[key]
+        if owners:
+            self.urls[code] = next(iter(owners.values()))
+        else:
+            del self.owners[code]
+            del self.urls[code]
+        self.version += 1
+    
+    def resolve(self, code):
+        return self.urls.get(code)
+    
+    def owner(self, code):
+        owners = self.owners.get(code)
+        return next(iter(owners)) if owners else None
+    
+    def find(self, guild_id, url):
+        return self.by_url.get((str(guild_id), normalize_url(url)))
+    
+    def allocate(self, state):
+        while True:
+            n = state.get('next_code', 0)
+            state['next_code'] = n + 1
+            code = encode_code(n)
+            if code not in self.urls:
+                return code
\ No newline at end of file
@@ -0,0 +1,135 @@
+import json
+import sqlite3
+import threading
+from .records import USER_FIELDS, UserRecord
+from .files import index_parts
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS users (
+    guild_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    coins INTEGER NOT NULL DEFAULT 0,
+    bank INTEGER NOT NULL DEFAULT 0,
+    level INTEGER NOT NULL DEFAULT 1,
+    xp INTEGER NOT NULL DEFAULT 0,
+    last_message REAL NOT NULL DEFAULT 0,
+    last_daily REAL NOT NULL DEFAULT 0,
+    last_work REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, user_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS users_by_level ON users (guild_id, level DESC, xp DESC);
+CREATE TABLE IF NOT EXISTS sections (
+    section TEXT NOT NULL,
+    guild_id TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (section, guild_id)
+);
+'''
+
+COLUMNS = ', '.join(USER_FIELDS)
+UPSERT_USER = f'INSERT OR REPLACE INTO users (guild_id, user_id, {COLUMNS}) VALUES ({", ".join("?" * (len(USER_FIELDS) + 2))})'
+SELECT_USER = f'SELECT {COLUMNS} FROM users WHERE guild_id = ? AND user_id = ?'
+SELECT_GUILD = f'SELECT user_id, {COLUMNS} FROM users WHERE guild_id = ?'
+ROW_BYTES = 8 * (len(USER_FIELDS) + 2)
+
+def connect(filename):
+    conn = sqlite3.connect(filename, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
+class SQLiteEngine:
+    def __init__(self, filename):
+        self.filename = filename
+        # WAL lets the event loop read through its own connection while the writer thread commits
+        self.conn = connect(filename)
+        self.conn.executescript(SCHEMA)
+        self.reader = connect(filename)
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.inflight = {}
+        self.dirty_sections = set()
+        self.cache = {}
+        for name, guild_id, value in self.reader.execute('SELECT section, guild_id, value FROM sections'):
+            self.cache.setdefault(name, {})[guild_id] = json.loads(value)
+    
+    def get_user(self, guild_id, user_id):
+        key = (guild_id, user_id)
+        with self.lock:
+            record = self.pending.get(key) or self.inflight.get(key)
+        if record is not None:
+            return record
+        row = self.reader.execute(SELECT_USER, key).fetchone()
+        return UserRecord(*row) if row else UserRecord()
+    
+    def put_user(self, guild_id, user_id, record):
+        with self.lock:
+            self.pending[(guild_id, user_id)] = record
+    
+    def guild_ids(self):
+        with self.lock:
+            recent = {guild_id for guild_id, user_id in (*self.inflight, *self.pending)}
+        return sorted(recent.union(row[0] for row in self.reader.execute('SELECT DISTINCT guild_id FROM users')))
+    
+    def guild_users(self, guild_id):
+        with self.lock:
+            recent = {user_id: record for (g, user_id), record in (*self.inflight.items(), *self.pending.items()) if g == guild_id}
+        users = [(row[0], UserRecord(*row[1:])) for row in self.reader.execute(SELECT_GUILD, (guild_id,)) if row[0] not in recent]
+        users.extend(recent.items())
+        return users
+    
+    def get_section(self, name, guild_id):
+        return self.cache.get(name, {}).get(guild_id)
+    
+    def set_section(self, name, guild_id, value):
+        self.cache.setdefault(name, {})[guild_id] = value
+        self.mark_section(name, guild_id)
+    
+    def mark_section(self, name, guild_id, path=()):
+        with self.lock:
+            self.dirty_sections.add((name, guild_id))
+    
+    def mark_all(self):
+        with self.lock:
+            for name, section in self.cache.items():
+                self.dirty_sections.update((name, guild_id) for guild_id in section)
+    
+    def sections(self, name):
+        return list(self.cache.get(name, {}).items())
+    
+    def index_sources(self, parts):
+        return index_parts(self.sections, parts)
+    
+    def flush(self):
+        with self.lock:
+            self.inflight = batch = self.pending
+            self.pending = {}
+            sections, self.dirty_sections = self.dirty_sections, set()
+        
+        try:
+            rows = [(guild_id, user_id, *record.astuple()) for (guild_id, user_id), record in batch.items()]
+            written = len(rows) * ROW_BYTES
+            with self.conn:
+                self.conn.executemany(UPSERT_USER, rows)
+                for name, guild_id in sections:
+                    value = self.cache.get(name, {}).get(guild_id)
+                    if value is None:
+                        self.conn.execute('DELETE FROM sections WHERE section = ? AND guild_id = ?', (name, guild_id))
+                        continue
+                    payload = json.dumps(value, separators=(',', ':'))
+                    self.conn.execute('INSERT OR REPLACE INTO sections VALUES (?, ?, ?)', (name, guild_id, payload))
+                    written += len(payload)
+        except Exception:
+            with self.lock:
+                for key, data in batch.items():
+                    self.pending.setdefault(key, data)
+                self.dirty_sections |= sections
+            raise
+        finally:
+            with self.lock:
+                self.inflight = {}
+        return written
+    
+    def close(self):
+        self.reader.close()
+        self.conn.close()
\ No newline at end of file
@@ -0,0 +1,31 @@
+class GuildTotals:
+    def __init__(self, users):
+        # last seen (coins, bank) per user, records are often mutated in place so the old values can't come from them
+        self.balances = {user_id: (record.coins, record.bank) for user_id, record in users}
+        self.coins = sum(coins for coins, bank in self.balances.values())
+        self.bank = sum(bank for coins, bank in self.balances.values())
+    
+    def update(self, user_id, record):
+        old = self.balances.get(user_id)
+        if old is not None and old[0] == record.coins and old[1] == record.bank:
+            return
+        coins, bank = old or (0, 0)
+        self.coins += record.coins - coins
+        self.bank += record.bank - bank
+        self.balances[user_id] = (record.coins, record.bank)
+
+class TotalsIndex:
+    def __init__(self, engine):
+        self.engine = engine
+        self.guilds = {}
+    
+    def get(self, guild_id):
+        totals = self.guilds.get(guild_id)
+        if totals is None:
+            totals = self.guilds[guild_id] = GuildTotals(self.engine.guild_users(guild_id))
+        return totals
+    
+    def update(self, guild_id, user_id, record):
+        totals = self.guilds.get(guild_id)
+        if totals is not None:
+            totals.update(user_id, record)
\ No newline at end of file
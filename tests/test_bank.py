@@ -0,0 +1,75 @@
+import asyncio
+import json
+import random
+import pytest
+from storage import SimpleDB, JSONEngine, InsufficientFunds, OnCooldown
+
+GUILD = 1
+USERS = 20
+START = 1000
+
+def make_db(tmp_path):
+    engine = JSONEngine(str(tmp_path / 'data.json'))
+    db = SimpleDB(engine, flush_interval=3600, ledger_file=str(tmp_path / 'ledger.jsonl'))
+    for user_id in range(USERS):
+        record = db.get_user(GUILD, user_id)
+        record.coins = START
+        db.set_user(GUILD, user_id, record)
+    return db
+
+def read_ledger(db):
+    db.bank.ledger.flush()
+    with open(db.bank.ledger.filename) as f:
+        return [json.loads(line) for line in f]
+
+async def random_transaction(bank, rng):
+    user_id = rng.randrange(USERS)
+    amount = rng.randrange(1, 300)
+    action = rng.choice(['transfer', 'deposit', 'withdraw'])
+    try:
+        await asyncio.sleep(0)
+        if action == 'transfer':
+            await bank.transfer(GUILD, user_id, (user_id + rng.randrange(1, USERS)) % USERS, amount)
+        else:
+            await getattr(bank, action)(GUILD, user_id, amount)
+    except InsufficientFunds:
+        pass
+
+def test_concurrent_transactions_conserve_coins(tmp_path):
+    rng = random.Random(4)
+    db = make_db(tmp_path)
+    try:
+        async def run():
+            await asyncio.gather(*(random_transaction(db.bank, rng) for _ in range(2000)))
+        asyncio.run(run())
+        
+        records = {user_id: db.get_user(GUILD, user_id) for user_id in range(USERS)}
+        assert sum(record.coins + record.bank for record in records.values()) == USERS * START
+        assert all(record.coins >= 0 and record.bank >= 0 for record in records.values())
+        
+        entries = read_ledger(db)
+        for user_id, record in records.items():
+            mine = [entry for entry in entries if entry['u'] == user_id]
+            assert START + sum(entry['coins'] for entry in mine) == record.coins
+            assert sum(entry['bank'] for entry in mine) == record.bank
+            if mine:
+                assert mine[-1]['balance'] == [record.coins, record.bank]
+    finally:
+        db.close()
+
+def test_overdraw_and_cooldown_change_nothing(tmp_path):
+    db = make_db(tmp_path)
+    try:
+        with pytest.raises(InsufficientFunds):
+            asyncio.run(db.bank.transfer(GUILD, 0, 1, START + 1))
+        with pytest.raises(InsufficientFunds):
+            asyncio.run(db.bank.withdraw(GUILD, 0, 1))
+        asyncio.run(db.bank.reward(GUILD, 0, 50, 'daily', cooldown=('last_daily', 86400)))
+        with pytest.raises(OnCooldown):
+            asyncio.run(db.bank.reward(GUILD, 0, 50, 'daily', cooldown=('last_daily', 86400)))
+        
+        assert db.get_user(GUILD, 0).coins == START + 50
+        assert db.get_user(GUILD, 1).coins == START
+        assert [entry['reason'] for entry in read_ledger(db)] == ['daily']
+    finally:
+        db.close()
\ No newline at end of file
@@ -0,0 +1,107 @@
+import json
+import os
+from storage import JournalEngine, ShardedEngine
+from storage.records import UserRecord
+
+def test_journal_replays_after_reopen(tmp_path):
+    filename = str(tmp_path / 'data.json')
+    engine = JournalEngine(filename, 1 << 20)
+    engine.put_user(1, 10, UserRecord(coins=5, level=3))
+    engine.set_section('guilds', '1', {'urls': {'abc': 'https://example.com/'}})
+    engine.get_section('guilds', '1')['urls']['def'] = 'https://example.org/'
+    engine.mark_section('guilds', '1', ('urls', 'def'))
+    del engine.get_section('guilds', '1')['urls']['abc']
+    engine.mark_section('guilds', '1', ('urls', 'abc'))
+    engine.flush()
+    assert not os.path.exists(filename)
+    
+    engine = JournalEngine(filename, 1 << 20)
+    assert engine.get_user(1, 10).astuple() == UserRecord(coins=5, level=3).astuple()
+    assert engine.get_section('guilds', '1') == {'urls': {'def': 'https://example.org/'}}
+
+def test_journal_compacts_into_snapshot(tmp_path):
+    filename = str(tmp_path / 'data.json')
+    engine = JournalEngine(filename, 2000)
+    for n in range(100):
+        engine.put_user(1, n, UserRecord(coins=n))
+        engine.flush()
+    assert os.path.getsize(engine.journal) <= 2000
+    assert engine.journal_bytes == os.path.getsize(engine.journal)
+    
+    engine = JournalEngine(filename, 2000)
+    assert [record.coins for user_id, record in engine.guild_users(1)] == list(range(100))
+
+def test_journal_drops_torn_last_line(tmp_path):
+    filename = str(tmp_path / 'data.json')
+    engine = JournalEngine(filename, 1 << 20)
+    engine.put_user(1, 1, UserRecord(coins=1))
+    engine.put_user(1, 2, UserRecord(coins=2))
+    engine.flush()
+    size = os.path.getsize(engine.journal)
+    os.truncate(engine.journal, size - 5)
+    
+    engine = JournalEngine(filename, 1 << 20)
+    assert [user_id for user_id, record in engine.guild_users(1)] == [1]
+    engine.put_user(1, 3, UserRecord(coins=3))
+    engine.flush()
+    
+    engine = JournalEngine(filename, 1 << 20)
+    assert [user_id for user_id, record in engine.guild_users(1)] == [1, 3]
+
+def fill_shards(directory, guilds, users):
+    engine = ShardedEngine(directory, 1 << 30)
+    for guild_id in range(guilds):
+        for user_id in range(users):
+            engine.put_user(guild_id, user_id, UserRecord(coins=user_id))
+    engine.flush()
+    return engine.size(0, engine.shard(0))
+
+def cached_bytes(engine):
+    return sum(engine.size(guild_id, shard) for guild_id, shard in engine.shards.items())
+
+def test_sharded_eviction_respects_budget(tmp_path):
+    size = fill_shards(str(tmp_path), 20, 50)
+    engine = ShardedEngine(str(tmp_path), size * 5)
+    for guild_id in range(20):
+        assert len(engine.guild_users(guild_id)) == 50
+        assert cached_bytes(engine) <= size * 5
+    assert len(engine.shards) == 5
+    assert engine.stats['evictions'] == 15
+
+def test_sharded_eviction_counts_unflushed_users(tmp_path):
+    size = fill_shards(str(tmp_path), 10, 50)
+    engine = ShardedEngine(str(tmp_path), size * 5)
+    for guild_id in range(100, 104):
+        for user_id in range(50):
+            engine.put_user(guild_id, user_id, UserRecord())
+    for guild_id in range(10):
+        engine.shard(guild_id)
+    assert cached_bytes(engine) <= size * 5
+    assert [guild_id for guild_id in engine.shards if guild_id < 100] == [9]
+
+def test_sharded_never_evicts_dirty(tmp_path):
+    size = fill_shards(str(tmp_path), 20, 50)
+    engine = ShardedEngine(str(tmp_path), size * 2)
+    for guild_id in range(10):
+        engine.put_user(guild_id, 0, UserRecord(coins=guild_id + 1000))
+    for guild_id in range(10, 20):
+        engine.shard(guild_id)
+    assert set(range(10)) <= set(engine.shards)
+    
+    engine.flush()
+    engine.shard(20)
+    assert cached_bytes(engine) <= size * 2
+    engine = ShardedEngine(str(tmp_path), size * 2)
+    assert [engine.get_user(guild_id, 0).coins for guild_id in range(10)] == [guild_id + 1000 for guild_id in range(10)]
+
+def test_sharded_index_survives_restart(tmp_path):
+    engine = ShardedEngine(str(tmp_path), 1 << 20)
+    engine.index_sources({'guilds': 'urls'})
+    engine.set_section('guilds', '5', {'urls': {'abc': 'https://example.com/'}, 'clicks': {}})
+    engine.flush()
+    
+    engine = ShardedEngine(str(tmp_path), 1 << 20)
+    with open(engine.global_file) as f:
+        assert json.load(f)['_index']['guilds'] == {'5': {'abc': 'https://example.com/'}}
+    assert engine.index_sources({'guilds': 'urls'}) == {'guilds': [('5', {'abc': 'https://example.com/'})]}
+    assert not engine.shards
\ No newline at end of file
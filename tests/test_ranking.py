@@ -0,0 +1,84 @@
+import random
+from storage import SimpleDB, JSONEngine
+from storage.ranking import SORT_KEYS, PAGE_SIZE
+from storage.records import UserRecord
+
+GUILD = 1
+
+def random_record(rng):
+    return UserRecord(coins=rng.randrange(1000), bank=rng.randrange(1000), level=rng.randrange(1, 20), xp=rng.randrange(100))
+
+def full_sort(db, sort):
+    users = db.engine.guild_users(GUILD)
+    return [user_id for user_id, record in sorted(users, key=lambda item: SORT_KEYS[sort](*item))]
+
+def render(sort, offset, users, total):
+    return [(user_id, record.astuple()) for user_id, record in users]
+
+def fresh(db, page, sort):
+    offset = page * PAGE_SIZE
+    return render(sort, offset, db.leaderboard(GUILD, PAGE_SIZE, offset, sort), None)
+
+def make_db(tmp_path, rng, users=200):
+    engine = JSONEngine(str(tmp_path / 'data.json'))
+    for user_id in range(users):
+        engine.put_user(GUILD, user_id, random_record(rng))
+    return SimpleDB(engine, flush_interval=3600, ledger_file=str(tmp_path / 'ledger.jsonl'))
+
+def test_rankings_match_full_sort(tmp_path):
+    rng = random.Random(1)
+    db = make_db(tmp_path, rng)
+    try:
+        for sort in SORT_KEYS:
+            db.rankings.get(GUILD, sort)
+        for _ in range(3000):
+            user_id = rng.randrange(250)
+            record = db.get_user(GUILD, user_id)
+            if rng.random() < 0.5:
+                record.coins = rng.randrange(1000)
+            else:
+                record.level, record.xp = rng.randrange(1, 20), rng.randrange(100)
+            db.set_user(GUILD, user_id, record)
+        for sort in SORT_KEYS:
+            expected = full_sort(db, sort)
+            assert db.rankings.get(GUILD, sort).page(0, len(expected)) == expected
+            user_id = rng.choice(expected)
+            assert db.rank(GUILD, user_id, sort) == (expected.index(user_id) + 1, len(expected))
+    finally:
+        db.close()
+
+def test_cached_pages_never_stale(tmp_path):
+    rng = random.Random(2)
+    db = make_db(tmp_path, rng)
+    try:
+        for _ in range(3000):
+            sort = rng.choice(list(SORT_KEYS))
+            page = rng.randrange(22)
+            rendered, total, page = db.leaderboard_page(GUILD, page, sort, render)
+            assert rendered == fresh(db, page, sort)
+            
+            user_id = rng.randrange(220)
+            db.set_user(GUILD, user_id, random_record(rng))
+    finally:
+        db.close()
+
+def test_totals_match_full_scan(tmp_path):
+    rng = random.Random(3)
+    db = make_db(tmp_path, rng)
+    try:
+        db.totals.get(GUILD)
+        for _ in range(2000):
+            user_id = rng.randrange(250)
+            record = db.get_user(GUILD, user_id)
+            record.coins += rng.randrange(-record.coins, 500)
+            record.bank += rng.randrange(-record.bank, 500)
+            db.set_user(GUILD, user_id, record)
+        users = [record for user_id, record in db.engine.guild_users(GUILD)]
+        economy = db.economy(GUILD)
+        assert economy['coins'] == sum(record.coins for record in users)
+        assert economy['bank'] == sum(record.bank for record in users)
+        assert economy['users'] == len(users)
+        wealth = sorted((record.coins + record.bank for record in users), reverse=True)
+        assert economy['top_share'] == sum(wealth[:10]) / sum(wealth)
+    finally:
+        db.close()
\ No newline at end of file
@@ -0,0 +1,44 @@
+import random
+import pytest
+from storage import relevel
+from storage.records import UserRecord
+
+def slow_level(total, per_level):
+    level = 1
+    while relevel.total_xp(level + 1, 0, per_level) <= total:
+        level += 1
+    return level
+
+def test_solve_level_exact():
+    for per_level in (1, 7, 100, 250):
+        for total in range(20000):
+            assert relevel.solve_level(total, per_level) == slow_level(total, per_level)
+
+def test_solve_level_exact_at_boundaries():
+    for per_level in (1, 100, 12345):
+        for level in (2, 1000, 10 ** 6, 10 ** 9):
+            start = relevel.total_xp(level, 0, per_level)
+            assert relevel.solve_level(start - 1, per_level) == level - 1
+            assert relevel.solve_level(start, per_level) == level
+
+def test_numpy_matches_python():
+    pytest.importorskip('numpy')
+    rng = random.Random(5)
+    levels = [rng.randrange(1, 10 ** 6) for _ in range(20000)] + [1, 2, 10 ** 6]
+    xps = [rng.randrange(10 ** 4) for _ in levels]
+    for old, new in ((100, 150), (150, 100), (100, 1), (7, 12345)):
+        assert relevel.relevel_numpy(levels, xps, old, new) == relevel.relevel_python(levels, xps, old, new)
+
+def test_relevel_keeps_total_xp_and_pays_coins():
+    users = [(1, user_id, UserRecord(coins=0, level=level, xp=xp)) for user_id, (level, xp) in enumerate([(1, 0), (5, 30), (20, 99)])]
+    old = {'per_level': 100, 'level_up_multiplier': 10}
+    new = {'per_level': 50, 'level_up_multiplier': 10}
+    changes = relevel.relevel(users, old, new, coins=True)
+    for guild_id, user_id, record, level, xp, coins in changes:
+        assert relevel.total_xp(level, xp, 50) == relevel.total_xp(record.level, record.xp, 100)
+        assert 0 <= xp < level * 50
+        assert coins == relevel.level_rewards(level, 10) - relevel.level_rewards(record.level, 10)
+    assert [change[1] for change in changes] == [1, 2]
+    
+    down = relevel.relevel(users, new, old, coins=True)
+    assert all(record.coins + coins == 0 for guild_id, user_id, record, level, xp, coins in down)
\ No newline at end of file
@@ -0,0 +1,34 @@
+from storage.shortlinks import ShortLinkIndex, encode_code, normalize_url, ALPHABET, CODE_LENGTH
+
+def test_codes_unique():
+    codes = [encode_code(n) for n in range(100000)]
+    assert len(set(codes)) == len(codes)
+    assert all(len(code) == CODE_LENGTH and set(code) <= set(ALPHABET) for code in codes)
+
+def test_codes_longer_after_six_chars_run_out():
+    last = len(ALPHABET) ** CODE_LENGTH
+    assert len(encode_code(last - 1)) == CODE_LENGTH
+    assert len(encode_code(last)) == CODE_LENGTH + 1
+
+def test_allocate_skips_existing():
+    taken = {encode_code(n): f'https://example.com/{n}' for n in (0, 1, 3)}
+    index = ShortLinkIndex([('1', taken)])
+    state = {}
+    codes = [index.allocate(state) for _ in range(3)]
+    assert codes == [encode_code(2), encode_code(4), encode_code(5)]
+    assert state['next_code'] == 6
+
+def test_first_guild_wins_duplicate_code():
+    index = ShortLinkIndex([('1', {'abc': 'https://one.example/'}), ('2', {'abc': 'https://two.example/'})])
+    assert index.resolve('abc') == 'https://one.example/'
+    index.remove('1', 'abc')
+    assert index.resolve('abc') == 'https://two.example/'
+    assert index.owner('abc') == '2'
+    index.remove('2', 'abc')
+    assert 'abc' not in index
+
+def test_find_normalizes_url():
+    index = ShortLinkIndex([('1', {'abc': 'HTTPS://Example.com:443'})])
+    assert normalize_url('https://EXAMPLE.com') == 'https://example.com/'
+    assert index.find('1', 'https://example.com/') == 'abc'
+    assert index.find('2', 'https://example.com/') is None
\ No newline at end of file
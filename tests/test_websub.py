@@ -0,0 +1,156 @@
+import asyncio
+import hmac
+import os
+import socket
+import subprocess
+import sys
+import time
+import pytest
+
+aiohttp = pytest.importorskip('aiohttp')
+from aiohttp import web
+from feeds import WebSubscriber
+from redirect.table import publish
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE = os.path.join(ROOT, 'benchmarks', 'fixtures', 'synthetic_youtube_feed.xml')
+CHANNEL = 'UCstandinchannel'
+LEASE = 600
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+async def start(app, port):
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', port).start()
+    return runner
+
+class StandInHub:
+    # answers like the real hub: accept, then verify against the callback and deliver to it
+    def __init__(self, body):
+        self.body = body
+        self.requests = []
+        self.results = {}
+        self.tasks = []
+    
+    async def subscribe(self, request):
+        form = dict(await request.post())
+        self.requests.append(form)
+        self.tasks.append(asyncio.create_task(self.verify_and_deliver(form)))
+        return web.Response(status=202)
+    
+    async def verify_and_deliver(self, form):
+        mode = form['hub.mode']
+        params = {'hub.mode': mode, 'hub.topic': form['hub.topic'], 'hub.challenge': 'c4ll3nge', 'hub.lease_seconds': str(LEASE)}
+        async with aiohttp.ClientSession() as session:
+            async with session.get(form['hub.callback'], params=params) as resp:
+                self.results[f'{mode} verified'] = resp.status == 200 and await resp.text() == 'c4ll3nge'
+            if mode != 'subscribe':
+                return
+            
+            signature = hmac.new(form['hub.secret'].encode(), self.body, 'sha1').hexdigest()
+            async with session.post(form['hub.callback'], data=self.body, headers={'X-Hub-Signature': f'sha1={signature}'}) as resp:
+                self.results['signed delivery'] = resp.status
+            async with session.post(form['hub.callback'], data=self.body, headers={'X-Hub-Signature': 'sha1=0000'}) as resp:
+                self.results['forged delivery'] = resp.status
+            async with session.get(form['hub.callback'], params={**params, 'hub.mode': 'unsubscribe'}) as resp:
+                self.results['unrequested unsubscribe'] = resp.status
+    
+    async def settle(self):
+        await asyncio.gather(*self.tasks)
+        self.tasks = []
+
+async def run(workers, tmp_path):
+    with open(FIXTURE, 'rb') as f:
+        hub = StandInHub(f.read())
+    hub_app = web.Application()
+    hub_app.router.add_post('/subscribe', hub.subscribe)
+    hub_port = free_port()
+    hub_runner = await start(hub_app, hub_port)
+    
+    port = free_port()
+    pushed = []
+    websub = WebSubscriber(f'http://127.0.0.1:{hub_port}/subscribe', f'http://127.0.0.1:{port}', 'stand-in-secret', LEASE, lambda channel_id, video: pushed.append((channel_id, video['video_id'])))
+    app = web.Application()
+    app.router.add_get('/websub/{channel_id}', websub.verify)
+    app.router.add_post('/websub/{channel_id}', websub.deliver)
+    
+    worker = None
+    if workers:
+        # the way the bot runs with redirect workers: they own the public port and pass /websub/ on
+        table = str(tmp_path / 'redirects.idx')
+        publish(table, [('abc', 'https://example.com')])
+        internal = free_port()
+        runner = await start(app, internal)
+        worker = subprocess.Popen(
+            [sys.executable, '-m', 'redirect.worker', '--host', '127.0.0.1', '--port', str(port), '--table', table, '--upstream', f'http://127.0.0.1:{internal}'],
+            cwd=ROOT, stdout=subprocess.DEVNULL, env={**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path)}
+        )
+        await wait_for_port(port)
+    else:
+        runner = await start(app, port)
+    websub.listening = True
+    
+    results = {}
+    try:
+        now = time.monotonic()
+        await websub.sync([CHANNEL], now)
+        await hub.settle()
+        results['active'] = websub.active(CHANNEL, time.monotonic())
+        results['pushed'] = list(pushed)
+        results['rejected'] = websub.stats['rejected']
+        results.update(hub.results)
+        
+        await websub.sync([CHANNEL], time.monotonic())
+        results['requests early in lease'] = len(hub.requests)
+        await websub.sync([CHANNEL], now + LEASE * 0.85)
+        await hub.settle()
+        results['requests late in lease'] = len(hub.requests)
+        results['verified'] = websub.stats['verified']
+        
+        await websub.sync([], time.monotonic())
+        await hub.settle()
+        results['last mode'] = hub.requests[-1]['hub.mode']
+        results['unsubscribe verified'] = hub.results.get('unsubscribe verified', False)
+        
+        if workers:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f'http://127.0.0.1:{port}/abc', allow_redirects=False) as resp:
+                    results['redirect'] = resp.status
+    finally:
+        if worker:
+            worker.terminate()
+            worker.wait()
+        await websub.close()
+        await runner.cleanup()
+        await hub_runner.cleanup()
+    return results
+
+async def wait_for_port(port, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise TimeoutError(f'nothing listening on {port}')
+
+@pytest.mark.parametrize('workers', [False, True], ids=['direct', 'through-worker'])
+def test_stand_in_hub(workers, tmp_path):
+    results = asyncio.run(run(workers, tmp_path))
+    assert results['active']
+    assert results['subscribe verified']
+    assert results['signed delivery'] < 300 and results['forged delivery'] < 300
+    assert results['pushed'] == [(CHANNEL, 'PtYgjmUhBel')]
+    assert results['rejected'] == 1
+    assert results['unrequested unsubscribe'] == 404
+    assert results['requests early in lease'] == 1
+    assert results['requests late in lease'] == 2 and results['verified'] == 2
+    assert results['last mode'] == 'unsubscribe' and results['unsubscribe verified']
+    if workers:
+        assert results['redirect'] == 301
\ No newline at end of file